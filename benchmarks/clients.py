@@ -0,0 +1,170 @@
+"""
+Measures the overhead of the clients against an in-process mock transport.
+Requests/sec and CPU time per call are written as JSON
+
+    $ PYTHONPATH=. python benchmarks/clients.py --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+
+import httpx
+
+import ymaps
+from payloads import (
+    encode,
+    geocode_response,
+    search_response,
+    static_image,
+    suggest_response,
+)
+
+RESULTS = 10
+IMAGE_SIZE = 30 * 1024
+BATCH_SIZES = (10, 100)
+CONCURRENCY = (1, 4, 16)
+
+
+def get_transport():
+    """Returns a transport answering every service with a payload of real size"""
+    contents = {
+        "search-maps.yandex.ru": encode(search_response(RESULTS)),
+        "geocode-maps.yandex.ru": encode(geocode_response(RESULTS)),
+        "suggest-maps.yandex.ru": encode(suggest_response(RESULTS)),
+        "static-maps.yandex.ru": static_image(IMAGE_SIZE),
+    }
+
+    def handler(request):
+        return httpx.Response(200, content=contents[request.url.host])
+
+    return httpx.MockTransport(handler)
+
+
+def get_clients(transport, asynchronous):
+    names = ("Search", "Geocode", "Suggest", "Static")
+    suffix = "Async" if asynchronous else ""
+    return [
+        getattr(ymaps, name + suffix)("api_key", transport=transport) for name in names
+    ]
+
+
+def get_cases(clients):
+    """Yields (method, call) pairs, call sends a single request"""
+    search, geocode, suggest, static = clients
+    prepared_search = search.prepare(ll=[37.61892, 55.756994], results=RESULTS)
+    yield "search", lambda: search.search("кафе", results=RESULTS)
+    yield "search (prepared)", lambda: prepared_search("кафе")
+    yield "geocode", lambda: geocode.geocode("Москва, Новый Арбат", results=RESULTS)
+    yield "reverse", lambda: geocode.reverse([37.611347, 55.760241], results=RESULTS)
+    yield "suggest", lambda: suggest.suggest("санкт", results=RESULTS)
+    yield "get_image", lambda: static.get_image(ll=[37.61892, 55.756994], z=12)
+
+
+def get_batch_cases(clients):
+    """Yields (method, batch, concurrency, call) tuples, call sends a batch"""
+    search = clients[0]
+    for batch in BATCH_SIZES:
+        queries = ["кафе {}".format(index) for index in range(batch)]
+        for concurrency in CONCURRENCY:
+            yield "search_many", batch, concurrency, (
+                lambda queries=queries, concurrency=concurrency: search.search_many(
+                    queries, concurrency=concurrency, results=RESULTS
+                )
+            )
+
+
+def get_result(mode, method, calls, seconds, cpu_seconds, batch=1, concurrency=1):
+    return {
+        "mode": mode,
+        "method": method,
+        "batch": batch,
+        "concurrency": concurrency,
+        "calls": calls,
+        "seconds": seconds,
+        "rps": calls / seconds,
+        "cpu_us_per_call": cpu_seconds / calls * 1e6,
+    }
+
+
+def measure(call, number):
+    call()
+    start, cpu_start = time.perf_counter(), time.process_time()
+    for _ in range(number):
+        call()
+    return time.perf_counter() - start, time.process_time() - cpu_start
+
+
+async def measure_async(call, number):
+    await call()
+    start, cpu_start = time.perf_counter(), time.process_time()
+    for _ in range(number):
+        await call()
+    return time.perf_counter() - start, time.process_time() - cpu_start
+
+
+def run_sync(number):
+    clients = get_clients(get_transport(), asynchronous=False)
+    results = []
+    for method, call in get_cases(clients):
+        seconds, cpu_seconds = measure(call, number)
+        results.append(get_result("sync", method, number, seconds, cpu_seconds))
+    for method, batch, concurrency, call in get_batch_cases(clients):
+        repeat = max(number // batch, 1)
+        seconds, cpu_seconds = measure(call, repeat)
+        results.append(
+            get_result(
+                "sync", method, repeat * batch, seconds, cpu_seconds, batch, concurrency
+            )
+        )
+    for client in clients:
+        client.close()
+    return results
+
+
+async def run_async(number):
+    clients = get_clients(get_transport(), asynchronous=True)
+    results = []
+    for method, call in get_cases(clients):
+        seconds, cpu_seconds = await measure_async(call, number)
+        results.append(get_result("async", method, number, seconds, cpu_seconds))
+    for method, batch, concurrency, call in get_batch_cases(clients):
+        repeat = max(number // batch, 1)
+        seconds, cpu_seconds = await measure_async(call, repeat)
+        results.append(
+            get_result(
+                "async", method, repeat * batch, seconds, cpu_seconds, batch, concurrency
+            )
+        )
+    for client in clients:
+        await client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=1000, help="calls per method")
+    parser.add_argument("--output", help="JSON file, stdout by default")
+    args = parser.parse_args()
+
+    report = {
+        "ymaps": ymaps.__version__,
+        "httpx": httpx.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "number": args.number,
+        "results": run_sync(args.number) + asyncio.run(run_async(args.number)),
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
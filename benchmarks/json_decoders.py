@@ -0,0 +1,38 @@
+"""
+Compares JSON decoders on search responses
+
+    $ PYTHONPATH=. python benchmarks/json_decoders.py
+"""
+
+import importlib
+import json
+import timeit
+
+from payloads import encode, search_response
+
+
+def get_decoders():
+    decoders = {
+        # the path of httpx.Response.json(): bytes are decoded to text first
+        "json (text)": lambda content: json.loads(content.decode("utf-8")),
+        "json (bytes)": json.loads,
+    }
+    for name in ("orjson", "ujson"):
+        try:
+            decoders[name] = importlib.import_module(name).loads
+        except ImportError:
+            pass
+    return decoders
+
+
+def main():
+    for results in (10, 100, 500):
+        content = encode(search_response(results))
+        print("results={} ({} KB)".format(results, len(content) // 1024))
+        for name, loads in get_decoders().items():
+            number, total = timeit.Timer(lambda: loads(content)).autorange()
+            print("  {:<14} {:>10.1f} us".format(name, total / number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
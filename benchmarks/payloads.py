@@ -0,0 +1,14 @@
+"""
+Synthetic API responses with the structure and size of real ones,
+the generators of the fake server in ymaps.testing
+"""
+
+from ymaps.testing import (  # noqa: F401
+    encode,
+    geo_object,
+    geocode_response,
+    png as static_image,
+    search_feature,
+    search_response,
+    suggest_response,
+)
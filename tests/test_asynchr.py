@@ -2,6 +2,12 @@
 Tests for asynchronous Yandex Maps API client
 """
 
+import asyncio
+import gc
+import os
+import stat
+
+import httpx
 import pytest
 from unittest import mock
 from pytest_httpx import HTTPXMock
@@ -12,6 +18,7 @@ from ymaps.exceptions import (
     UnexpectedResponse,
 )
 from ymaps.asynchr import (
+    AsyncClientRegistry,
     SearchAsyncClient,
     GeocodeAsyncClient,
     SuggestAsyncClient,
@@ -50,6 +57,18 @@ def test_init_static_client():
     assert static._client.timeout.read == 10
 
 
+@pytest.mark.asyncio
+async def test_shared_transport():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+    transport.aclose = mock.AsyncMock()
+    search = SearchAsyncClient("api_key", transport=transport)
+    geocode = GeocodeAsyncClient("api_key", transport=transport)
+    assert await search.search("cafe") == {}
+    await search.close()
+    assert await geocode.geocode("Moscow") == {}
+    transport.aclose.assert_not_called()
+
+
 # search testing
 
 
@@ -93,6 +112,15 @@ async def test_search_by_all_parameters(httpx_mock: HTTPXMock):
     assert actual == expected
 
 
+@pytest.mark.asyncio
+async def test_custom_json_loads(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={"request": "cafe"})
+    json_loads = mock.Mock(return_value={"decoded": True})
+    actual = await SearchAsyncClient("api_key", json_loads=json_loads).search("cafe")
+    assert actual == {"decoded": True}
+    json_loads.assert_called_once_with(b'{"request":"cafe"}')
+
+
 # geocode testing
 
 
@@ -325,6 +353,317 @@ async def test_get_image_by_all_parameters(httpx_mock: HTTPXMock):
     assert actual.decode() == f'"{expected}"'
 
 
+# batch testing
+
+
+@pytest.mark.asyncio
+async def test_geocode_many(httpx_mock: HTTPXMock):
+    requests = ["Moscow", "Kazan", "Omsk"]
+    for request in requests:
+        httpx_mock.add_response(
+            method="GET",
+            url=f"{GeocodeAsyncClient.BASE_URL}?apikey=api_key&lang=ru_RU&"
+            f"format=json&geocode={request}",
+            json={"request": request},
+        )
+    actual = await GeocodeAsyncClient("api_key").geocode_many(requests, concurrency=2)
+    assert actual == [{"request": request} for request in requests]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [0, -1])
+async def test_geocode_many_invalid_concurrency(concurrency):
+    with pytest.raises(ValueError):
+        await GeocodeAsyncClient("api_key").geocode_many(["Moscow"], concurrency=concurrency)
+
+
+@pytest.mark.asyncio
+async def test_geocode_many_returns_errors_per_item(httpx_mock: HTTPXMock):
+    url = f"{GeocodeAsyncClient.BASE_URL}?apikey=api_key&lang=ru_RU&format=json"
+    httpx_mock.add_response(url=f"{url}&geocode=Moscow", json={"request": "Moscow"})
+    httpx_mock.add_response(url=f"{url}&geocode=", status_code=400)
+    httpx_mock.add_response(url=f"{url}&geocode=Omsk", json={"request": "Omsk"})
+
+    actual = await GeocodeAsyncClient("api_key").geocode_many(["Moscow", "", "Omsk"])
+    assert actual[0] == {"request": "Moscow"}
+    assert isinstance(actual[1], InvalidParameters)
+    assert actual[2] == {"request": "Omsk"}
+
+
+@pytest.mark.asyncio
+async def test_reverse_many(httpx_mock: HTTPXMock):
+    requests = [[37.611347, 55.760241], [30.301324, 59.951921]]
+    for request in requests:
+        httpx_mock.add_response(
+            method="GET",
+            url=f"{GeocodeAsyncClient.BASE_URL}?apikey=api_key&lang=ru_RU&"
+            f"geocode={request[0]},{request[1]}&format=json&kind=house",
+            json={"request": request},
+        )
+    actual = await GeocodeAsyncClient("api_key").reverse_many(requests, kind="house")
+    assert actual == [{"request": request} for request in requests]
+
+
+@pytest.mark.asyncio
+async def test_search_many(httpx_mock: HTTPXMock):
+    requests = ["cafe", "bank"]
+    for request in requests:
+        httpx_mock.add_response(
+            method="GET",
+            url=f"{SearchAsyncClient.BASE_URL}?apikey=api_key&lang=ru_RU&text={request}",
+            json={"request": request},
+        )
+    actual = await SearchAsyncClient("api_key").search_many(iter(requests))
+    assert actual == [{"request": request} for request in requests]
+
+
+@pytest.mark.asyncio
+async def test_suggest_many(httpx_mock: HTTPXMock):
+    requests = ["санкт", "моск"]
+    for request in requests:
+        httpx_mock.add_response(
+            method="GET",
+            url=f"{SuggestAsyncClient.BASE_URL}?apikey=api_key&lang=ru&text={request}",
+            json={"request": request},
+        )
+    actual = await SuggestAsyncClient("api_key").suggest_many(requests, concurrency=1)
+    assert actual == [{"request": request} for request in requests]
+
+
+# coalescing testing
+
+
+async def delayed_response(request: httpx.Request):
+    await asyncio.sleep(0.05)
+    return httpx.Response(200, json={"request": request.url.params["text"]})
+
+
+@pytest.mark.asyncio
+async def test_coalesce_identical_requests(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(delayed_response)
+    client = SearchAsyncClient("api_key", coalesce=True)
+    actual = await asyncio.gather(*(client.search("cafe") for _ in range(5)))
+    assert actual == [{"request": "cafe"}] * 5
+    assert len(httpx_mock.get_requests()) == 1
+    assert client._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_coalesce_different_requests(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(delayed_response, is_reusable=True)
+    client = SearchAsyncClient("api_key", coalesce=True)
+    actual = await asyncio.gather(client.search("cafe"), client.search("bank"))
+    assert actual == [{"request": "cafe"}, {"request": "bank"}]
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_coalesce_cancelled_waiter(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(delayed_response)
+    client = SearchAsyncClient("api_key", coalesce=True)
+    cancelled = asyncio.ensure_future(client.search("cafe"))
+    waiter = asyncio.ensure_future(client.search("cafe"))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+    assert await waiter == {"request": "cafe"}
+    assert cancelled.cancelled()
+
+
+# registry testing
+
+
+def test_registry_client_per_loop():
+    registry = AsyncClientRegistry(GeocodeAsyncClient, "api_key", timeout=10)
+
+    async def get_clients():
+        return await registry.get(), await registry.get()
+
+    first, same = asyncio.run(get_clients())
+    second, _ = asyncio.run(get_clients())
+    assert first is same
+    assert first is not second
+    assert first._client.timeout.read == 10
+    assert first._client.is_closed
+    assert second._client.is_closed
+    assert len(registry._clients) == 0
+
+
+def test_registry_closed_loop():
+    registry = AsyncClientRegistry(GeocodeAsyncClient, "api_key")
+    loop = asyncio.new_event_loop()
+    collected = loop.run_until_complete(registry.get())
+    loop.close()
+    del loop
+    gc.collect()
+    assert collected._client.is_closed
+    assert len(registry._clients) == 0
+
+    loop = asyncio.new_event_loop()
+    closed = loop.run_until_complete(registry.get())
+    loop.close()
+    other = asyncio.run(registry.get())
+    assert closed._client.is_closed
+    assert other._client.is_closed
+    assert len(registry._clients) == 0
+
+
+@pytest.mark.asyncio
+async def test_registry_aclose():
+    registry = AsyncClientRegistry(SearchAsyncClient, "api_key")
+    client = await registry.get()
+    await registry.aclose()
+    assert client._client.is_closed
+    assert await registry.get() is not client
+    await registry.aclose()
+
+
+# load_image testing
+
+
+@pytest.mark.asyncio
+async def test_load_image(httpx_mock: HTTPXMock, tmp_path):
+    request = [37.611347, 55.760241]
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{StaticAsyncClient.BASE_URL}?apikey=api_key&lang=ru_RU&ll={request[0]},{request[1]}",
+        content=b"image" * 100000,
+    )
+    path = str(tmp_path / "map.png")
+    actual = await StaticAsyncClient("api_key").load_image(path, ll=request)
+    assert actual == path
+    with open(path, "rb") as file:
+        assert file.read() == b"image" * 100000
+    assert [item.name for item in tmp_path.iterdir()] == ["map.png"]
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~umask
+
+
+@pytest.mark.asyncio
+async def test_load_image_error(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_response(status_code=400)
+    with pytest.raises(InvalidParameters):
+        await StaticAsyncClient("api_key").load_image(str(tmp_path / "map.png"), ll=[0, 0])
+    assert list(tmp_path.iterdir()) == []
+
+
+# typeahead testing
+
+
+@pytest.mark.asyncio
+async def test_typeahead_debounces_updates(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(delayed_response)
+    results = []
+    session = SuggestAsyncClient("api_key").typeahead(
+        debounce=0.02, on_result=lambda text, result: results.append(text)
+    )
+    for text in ["с", "са", "сан"]:
+        session.update(text)
+    assert await session.result() == {"request": "сан"}
+    assert results == ["сан"]
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_typeahead_cancels_in_flight_request(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(delayed_response, is_reusable=True)
+    results = []
+    session = SuggestAsyncClient("api_key").typeahead(
+        debounce=0, on_result=lambda text, result: results.append(text)
+    )
+    stale = session.update("санкт")
+    waiter = asyncio.ensure_future(session.result())
+    await asyncio.sleep(0.02)
+    session.update("санкт-п")
+    assert await waiter == {"request": "санкт-п"}
+    assert stale.cancelled()
+    assert results == ["санкт-п"]
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_typeahead_retrieves_error_of_replaced_request(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=400)
+    httpx_mock.add_response(json={"request": "санкт"})
+    loop = asyncio.get_running_loop()
+    errors = []
+    loop.set_exception_handler(lambda loop, context: errors.append(context))
+    try:
+        session = SuggestAsyncClient("api_key").typeahead(debounce=0)
+        failed = session.update("")
+        await asyncio.wait([failed])
+        session.update("санкт")
+        del failed
+        gc.collect()
+        assert await session.result() == {"request": "санкт"}
+    finally:
+        loop.set_exception_handler(None)
+    assert errors == []
+
+
+# prepared requests testing
+
+
+@pytest.mark.asyncio
+async def test_prepared_search(httpx_mock: HTTPXMock):
+    for request in ["cafe", "bank"]:
+        httpx_mock.add_response(
+            method="GET",
+            url=f"{SearchAsyncClient.BASE_URL}?apikey=api_key&lang=ru_RU&text={request}&"
+            f"ll=37.61892,55.756994&spn=0.552069,0.400552&rspn=1&results=5",
+            json={"request": request},
+        )
+    search = SearchAsyncClient("api_key").prepare(
+        ll=[37.61892, 55.756994], spn=[0.552069, 0.400552], rspn=True, results=5
+    )
+    assert await search("cafe") == {"request": "cafe"}
+    assert await search("bank") == {"request": "bank"}
+    assert httpx_mock.get_requests()[0].extensions["timeout"]["read"] == 1
+
+
+@pytest.mark.asyncio
+async def test_prepared_reverse(httpx_mock: HTTPXMock):
+    request = [37.611347, 55.760241]
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{GeocodeAsyncClient.BASE_URL}?apikey=api_key&lang=ru_RU&"
+        f"geocode={request[0]},{request[1]}&format=json&kind=house",
+        json={"request": request},
+    )
+    reverse = GeocodeAsyncClient("api_key").prepare(kind="house")
+    assert await reverse(request) == {"request": request}
+
+
+def request_url(request):
+    url = request.url
+    return url.copy_with(query=None), sorted(url.params.multi_items())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url", ["v1", "1.x"])
+async def test_prepared_url_matches_get(httpx_mock: HTTPXMock, url):
+    httpx_mock.add_response(json={}, is_reusable=True)
+    search = SearchAsyncClient("api_key")
+    await search.search("cafe", results=5)
+    await search.prepare(results=5)("cafe")
+    geocode = GeocodeAsyncClient("api_key")
+    await geocode.geocode("Москва", kind="house")
+    await geocode.prepare(kind="house")("Москва")
+    await geocode.reverse([37.611347, 55.760241])
+    await geocode.prepare()([37.611347, 55.760241])
+    suggest = SuggestAsyncClient("api_key")
+    await suggest.suggest("санкт", results=3)
+    await suggest.prepare(results=3)("санкт")
+    static = StaticAsyncClient("api_key", url=url)
+    await static.get_image(ll=[37.620447, 55.753586], z=10)
+    await static.prepare(z=10)([37.620447, 55.753586])
+
+    requests = httpx_mock.get_requests()
+    for unprepared, prepared in zip(requests[::2], requests[1::2]):
+        assert request_url(prepared) == request_url(unprepared)
+    assert requests[-1].url.path == ("/1.x/" if url == "1.x" else "/v1")
+
+
 # testing context manager
 
 
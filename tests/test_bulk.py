@@ -0,0 +1,165 @@
+"""
+Tests for bulk geocoding of address files
+"""
+
+import csv
+import json
+from unittest import mock
+
+import httpx
+import pytest
+
+from ymaps import __main__ as cli
+from ymaps.asynchr import GeocodeAsyncClient
+from ymaps.bulk import Checkpoint, geocode_file
+from ymaps.exceptions import InvalidKey
+from ymaps.testing import FakeServer, geocode_response, uniform
+
+
+ADDRESSES = ["Москва, улица {}".format(index) for index in range(20)]
+
+
+def write_csv(path, addresses):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["id", "address"])
+        for index, address in enumerate(addresses):
+            writer.writerow([index, address])
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def get_client(**options):
+    server = FakeServer(**options)
+    return GeocodeAsyncClient("api_key", transport=server.async_transport())
+
+
+class StoppingClient:
+    """Raises InvalidKey for the address "stop" """
+
+    def __init__(self, client):
+        self.client = client
+
+    async def geocode(self, geocode, **params):
+        if geocode == "stop":
+            raise InvalidKey("stop")
+        return await self.client.geocode(geocode, **params)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("order", ["input", "completion"])
+async def test_geocode_file(tmp_path, order):
+    input_path, output_path = str(tmp_path / "in.csv"), str(tmp_path / "out.jsonl")
+    write_csv(input_path, ADDRESSES[:5] + [""] + ADDRESSES[5:])
+    client = get_client(latency=uniform(0, 0.005), seed=1)
+
+    stats = await geocode_file(client, input_path, output_path, order=order, concurrency=4)
+    rows = read_jsonl(output_path)
+    assert stats == {"rows": 21, "skipped": 0, "geocoded": 20, "errors": 1}
+    assert sorted(row["row"] for row in rows) == list(range(21))
+    if order == "input":
+        assert [row["row"] for row in rows] == list(range(21))
+    assert rows[0]["address"] == ADDRESSES[0]
+    assert rows[0]["lon"] and rows[0]["formatted"] and rows[0]["error"] is None
+    assert [row["error"] for row in rows if row["error"]] == ["ValueError: Empty address"]
+
+
+@pytest.mark.asyncio
+async def test_csv_output(tmp_path):
+    input_path, output_path = str(tmp_path / "in.jsonl"), str(tmp_path / "out.csv")
+    with open(input_path, "w", encoding="utf-8") as file:
+        for address in ADDRESSES[:3]:
+            file.write(json.dumps({"query": address}, ensure_ascii=False) + "\n")
+
+    await geocode_file(get_client(), input_path, output_path, column="query")
+    with open(output_path, newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["query"] for row in rows] == ADDRESSES[:3]
+    assert list(rows[0]) == [
+        "row", "query", "lon", "lat", "formatted", "kind", "precision", "error"
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("order", ["input", "completion"])
+async def test_resume(tmp_path, order):
+    input_path, output_path = str(tmp_path / "in.csv"), str(tmp_path / "out.jsonl")
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    write_csv(input_path, ADDRESSES[:7] + ["stop"] + ADDRESSES[7:])
+
+    with pytest.raises(InvalidKey):
+        await geocode_file(
+            StoppingClient(get_client()),
+            input_path,
+            output_path,
+            order=order,
+            concurrency=1,
+            checkpoint_path=checkpoint_path,
+            checkpoint_interval=3,
+        )
+    assert Checkpoint(checkpoint_path).rows == 7
+    # rows written after the last checkpoint of a crashed run
+    with open(output_path, "a", encoding="utf-8") as file:
+        file.write('{"row": 7, "address": "partial')
+
+    stats = await geocode_file(
+        get_client(),
+        input_path,
+        output_path,
+        order=order,
+        concurrency=3,
+        checkpoint_path=checkpoint_path,
+    )
+    assert stats["skipped"] == 7
+    assert [row["row"] for row in read_jsonl(output_path)][:7] == list(range(7))
+    assert sorted(row["row"] for row in read_jsonl(output_path)) == list(range(21))
+    assert Checkpoint(checkpoint_path).rows == 21
+
+
+def test_cli(tmp_path, capsys):
+    input_path, output_path = str(tmp_path / "in.csv"), str(tmp_path / "out.csv")
+    write_csv(input_path, ADDRESSES[:3])
+    server = FakeServer(api_key="api_key")
+
+    def client_class(*args, **kwargs):
+        return GeocodeAsyncClient(*args, transport=server.async_transport(), **kwargs)
+
+    with mock.patch.object(cli, "GeocodeAsyncClient", client_class):
+        code = cli.main(
+            ["geocode", input_path, output_path, "--api-key", "api_key", "--param", "kind=house"]
+        )
+    assert code == 0
+    assert json.loads(capsys.readouterr().err)["geocoded"] == 3
+    assert server.requests == 3
+
+    with mock.patch.dict("os.environ", {}, clear=True):
+        assert cli.main(["geocode", input_path, output_path, "--api-key", ""]) == 2
+
+
+def test_cli_list_params(tmp_path, capsys):
+    input_path, output_path = str(tmp_path / "in.csv"), str(tmp_path / "out.csv")
+    write_csv(input_path, ADDRESSES[:1])
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=geocode_response(1))
+
+    def client_class(*args, **kwargs):
+        return GeocodeAsyncClient(*args, transport=httpx.MockTransport(handler), **kwargs)
+
+    argv = ["geocode", input_path, output_path, "--api-key", "api_key"]
+    with mock.patch.object(cli, "GeocodeAsyncClient", client_class):
+        code = cli.main(argv + ["--param", "ll=37.6,55.7", "--param", "bbox=37.5,55.6~37.7,55.8"])
+    assert code == 0
+    (request,) = requests
+    assert request.url.params["ll"] == "37.6,55.7"
+    assert request.url.params["bbox"] == "37.5,55.6~37.7,55.8"
+
+    with pytest.raises(SystemExit) as error:
+        cli.main(argv + ["--param", "kind"])
+    assert error.value.code == 2
+    assert "NAME=VALUE" in capsys.readouterr().err
@@ -0,0 +1,240 @@
+"""
+Tests for response caches
+"""
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest import mock
+from httpx import Response
+from pytest_httpx import HTTPXMock
+
+from ymaps.api_parameters import request_key
+from ymaps.cache import BaseCache, MemoryCache, SQLiteCache
+from ymaps.exceptions import InvalidParameters
+from ymaps.sync import GeocodeClient, StaticClient
+from ymaps.asynchr import GeocodeAsyncClient, SearchAsyncClient, StaticAsyncClient
+
+
+URL = "https://geocode-maps.yandex.ru/1.x/"
+
+
+# request key testing
+
+
+def test_request_key_sorts_parameters():
+    first = request_key(URL, {"geocode": "Moscow", "format": "json", "lang": "ru_RU"})
+    second = request_key(URL, {"lang": "ru_RU", "format": "json", "geocode": "Moscow"})
+    assert first == second
+
+
+def test_request_key_normalizes_coordinates():
+    first = request_key(URL, {"ll": "37,55", "bbox": "36.830,55.67~38.24,55.91"})
+    second = request_key(URL, {"ll": "37.0,55.0", "bbox": "36.83,55.67~38.24,55.910"})
+    assert first == second
+
+
+def test_request_key_normalizes_reverse_coordinates():
+    first = request_key(URL, {"geocode": "37.6,55"})
+    second = request_key(URL, {"geocode": "37.60,55.0"})
+    assert first == second
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ("Москва, Тверская, 1", "Москва, Тверская, 1.0"),
+        ("A, B", "A,B"),
+        ("1_000", "1000"),
+        ("37.6, 55", "37.6,55"),
+    ],
+)
+def test_request_key_keeps_address_text(first, second):
+    assert request_key(URL, {"geocode": first}) != request_key(URL, {"geocode": second})
+    assert request_key(URL, {"geocode": first}) == request_key(URL, {"geocode": first + " "})
+
+
+def test_request_key_ignores_api_key():
+    assert request_key(URL, {"apikey": "first"}) == request_key(URL, {"apikey": "second"})
+
+
+# memory cache testing
+
+
+def test_memory_cache_hit_and_miss():
+    cache = MemoryCache()
+    assert cache.get("key") is None
+    cache.set("key", Response(200, content=b"response"), "geocode")
+    assert cache.get("key").content == b"response"
+    assert cache.stats == {"hits": 1, "misses": 1, "entries": 1, "bytes": 8}
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("first", Response(200), "geocode")
+    cache.set("second", Response(200), "geocode")
+    cache.get("first")
+    cache.set("third", Response(200), "geocode")
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+
+
+def test_memory_cache_max_bytes():
+    cache = MemoryCache(max_bytes=10)
+    cache.set("first", Response(200, content=b"123456"), "geocode")
+    cache.set("second", Response(200, content=b"123456"), "geocode")
+    cache.set("large", Response(200, content=b"12345678901"), "geocode")
+    assert len(cache) == 1
+    assert cache.size == 6
+    assert cache.get("second") is not None
+
+
+@mock.patch("ymaps.cache.time.monotonic")
+def test_memory_cache_service_ttl(monotonic):
+    cache = MemoryCache(ttl=10, service_ttl={"geocode": 100})
+    monotonic.return_value = 0
+    cache.set("search", Response(200), "search")
+    cache.set("geocode", Response(200), "geocode")
+    monotonic.return_value = 50
+    assert cache.get("search") is None
+    assert cache.get("geocode") is not None
+
+
+def test_memory_cache_errors():
+    cache = MemoryCache()
+    cache.set("invalid", Response(400), "geocode")
+    assert cache.get("invalid") is None
+
+    cache = MemoryCache(cache_errors=True)
+    cache.set("invalid", Response(400), "geocode")
+    cache.set("unavailable", Response(503), "geocode")
+    assert cache.get("invalid") is not None
+    assert cache.get("unavailable") is None
+
+
+# sqlite cache testing
+
+
+def test_sqlite_cache_hit_and_miss(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    assert cache.get("key") is None
+    cache.set("key", Response(200, json={"request": "Moscow"}), "geocode")
+    assert cache.get("key").json() == {"request": "Moscow"}
+    assert cache.stats == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteCache(path).set("key", Response(200, content=b"response"), "geocode")
+    assert SQLiteCache(path).get("key").content == b"response"
+
+
+@mock.patch("ymaps.cache.time.time")
+def test_sqlite_cache_ttl_and_vacuum(time, tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), ttl=10, service_ttl={"geocode": 100})
+    time.return_value = 0
+    cache.set("search", Response(200), "search")
+    cache.set("geocode", Response(200), "geocode")
+    time.return_value = 50
+    assert cache.get("search") is None
+    assert cache.get("geocode") is not None
+
+    cache.vacuum()
+    assert len(cache) == 1
+
+
+def test_sqlite_cache_export_and_import(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    cache.set("key", Response(200, content=b"response"), "geocode")
+    cache.export(str(tmp_path / "export.db"))
+
+    warmed = SQLiteCache(str(tmp_path / "warmed.db"))
+    warmed.import_from(str(tmp_path / "export.db"))
+    assert warmed.get("key").content == b"response"
+
+
+def test_sqlite_cache_closes_connections_of_all_threads(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), vacuum_interval=None)
+    for _ in range(3):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(cache.get, ["first", "second", "third", "fourth"]))
+    # connections of finished threads are closed by new ones
+    assert len(cache._connections) <= 3
+    connections = [connection for _, connection in cache._connections]
+
+    cache.close()
+    assert cache._connections == []
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+
+def test_cache_without_methods_is_not_created():
+    class IncompleteCache(BaseCache):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        IncompleteCache()
+
+
+# client testing
+
+
+def test_sync_client_cache(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={"request": "Moscow"})
+    client = GeocodeClient("api_key", cache=MemoryCache())
+    assert client.geocode("Moscow") == {"request": "Moscow"}
+    assert client.geocode("Moscow") == {"request": "Moscow"}
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_sync_client_does_not_cache_errors(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=400, is_reusable=True)
+    client = GeocodeClient("api_key", cache=MemoryCache())
+    for _ in range(2):
+        with pytest.raises(InvalidParameters):
+            client.geocode("")
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_sync_load_image_cache(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_response(content=b"image")
+    client = StaticClient("api_key", cache=MemoryCache())
+    assert client.get_image(ll=[37, 55]) == b"image"
+    path = client.load_image(str(tmp_path / "map.png"), ll=[37.0, 55.0])
+    with open(path, "rb") as file:
+        assert file.read() == b"image"
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_load_image_cache(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_response(content=b"image")
+    client = StaticAsyncClient("api_key", cache=SQLiteCache(str(tmp_path / "cache.db")))
+    assert await client.get_image(ll=[37, 55]) == b"image"
+    path = await client.load_image(str(tmp_path / "map.png"), ll=[37.0, 55.0])
+    with open(path, "rb") as file:
+        assert file.read() == b"image"
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_cache(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={"request": "cafe"})
+    cache = MemoryCache()
+    client = SearchAsyncClient("api_key", cache=cache)
+    assert await client.search("cafe", ll=[37, 55]) == {"request": "cafe"}
+    assert await client.search("cafe", ll=[37.0, 55.0]) == {"request": "cafe"}
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_sqlite_cache(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_response(json={"request": "Moscow"})
+    client = GeocodeAsyncClient("api_key", cache=SQLiteCache(str(tmp_path / "cache.db")))
+    assert await client.geocode("Moscow") == {"request": "Moscow"}
+    assert await client.geocode("Moscow") == {"request": "Moscow"}
+    assert len(httpx_mock.get_requests()) == 1
@@ -0,0 +1,169 @@
+"""
+Tests for recording and replay of API traffic
+"""
+
+import gzip
+
+import httpx
+import pytest
+
+from ymaps.cache import MemoryCache
+from ymaps.cassette import Cassette, CassetteMiss
+from ymaps.exceptions import InvalidParameters
+from ymaps.sync import GeocodeClient, SearchClient, StaticClient
+from ymaps.asynchr import SearchAsyncClient
+from ymaps.testing import FakeServer
+
+
+def test_record_and_replay(tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    server = FakeServer()
+    with Cassette(path, mode="record") as cassette:
+        client = SearchClient("secret", transport=server.transport(), cassette=cassette)
+        recorded = client.search("cafe", ll=[37.61892, 55.756994], results=5)
+        with pytest.raises(InvalidParameters):
+            client.search("")
+
+    with gzip.open(path, "rt") as file:
+        content = file.read()
+    assert content.count("\n") == 2
+    assert "secret" not in content
+
+    cassette = Cassette(path)
+    client = SearchClient("other_key", cassette=cassette)
+    assert client.search("cafe", ll=[37.618920, 55.756994], results=5) == recorded
+    with pytest.raises(InvalidParameters):
+        client.search("")
+    with pytest.raises(CassetteMiss):
+        client.search("bank")
+    assert server.requests == 2
+
+
+def test_append(tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    for text in ("cafe", "bank"):
+        with Cassette(path, mode="record") as cassette:
+            client = SearchClient(
+                "api_key", transport=FakeServer().transport(), cassette=cassette
+            )
+            client.search(text)
+
+    # a truncated end of the file is skipped
+    with open(path, "ab") as file:
+        file.write(b"\x1f\x8b\x08\x00")
+
+    client = SearchClient("api_key", cassette=Cassette(path))
+    client.search("cafe")
+    client.search("bank")
+
+
+def test_repeated_requests(tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    responses = iter([b"first", b"second"])
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=next(responses)))
+    with Cassette(path, mode="record") as cassette:
+        client = StaticClient(transport=transport, cassette=cassette)
+        client.get_image(ll=[37.620447, 55.753586])
+        client.get_image(ll=[37.620447, 55.753586])
+
+    client = StaticClient(cassette=Cassette(path))
+    assert [client.get_image(ll=[37.620447, 55.753586]) for _ in range(3)] == [
+        b"first", b"second", b"second"
+    ]
+
+
+def test_encoded_response(tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    body = gzip.compress(b'{"response": "gzip"}')
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(
+            200, headers={"content-encoding": "gzip"}, content=body
+        )
+    )
+    with Cassette(path, mode="record") as cassette:
+        client = GeocodeClient("api_key", transport=transport, cassette=cassette)
+        assert client.geocode("Москва") == {"response": "gzip"}
+
+    client = GeocodeClient("api_key", cassette=Cassette(path))
+    assert client.geocode("Москва") == {"response": "gzip"}
+
+
+def test_warm(tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    server = FakeServer()
+    with Cassette(path, mode="record") as cassette:
+        search = SearchClient("api_key", transport=server.transport(), cassette=cassette)
+        geocode = GeocodeClient("api_key", transport=server.transport(), cassette=cassette)
+        search.search("cafe", ll=[37.61892, 55.756994])
+        search.search("bank")
+        geocode.geocode("Москва")
+
+    cache = MemoryCache()
+    client = SearchClient("api_key", transport=server.transport(), cache=cache)
+    assert Cassette(path).warm(client) == 2
+    client.search("cafe", ll=[37.61892, 55.756994])
+    client.search("bank")
+    assert server.requests == 3
+    assert cache.hits == 2
+
+
+def test_append_after_crash(tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    server = FakeServer()
+    cassette = Cassette(path, mode="record")
+    SearchClient("api_key", transport=server.transport(), cassette=cassette).search("cafe")
+    # the process crashed, the last member has no end
+    with open(path, "rb") as file:
+        crashed = file.read()
+    cassette.close()
+    with open(path, "wb") as file:
+        file.write(crashed)
+
+    with Cassette(path, mode="record") as cassette:
+        client = SearchClient("api_key", transport=server.transport(), cassette=cassette)
+        client.search("bank")
+
+    client = SearchClient("api_key", cassette=Cassette(path))
+    client.search("cafe")
+    client.search("bank")
+    assert len(list(Cassette(path).records())) == 2
+
+
+def test_warm_static(tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    server = FakeServer()
+    with Cassette(path, mode="record") as cassette:
+        client = StaticClient(url="1.x", transport=server.transport(), cassette=cassette)
+        image = client.get_image(ll=[37.620447, 55.753586])
+
+    client = StaticClient(url="1.x", transport=server.transport(), cache=MemoryCache())
+    assert Cassette(path).warm(client) == 1
+    assert client.get_image(ll=[37.620447, 55.753586]) == image
+    assert server.requests == 1
+
+
+def test_warm_without_cache(tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    with Cassette(path, mode="record") as cassette:
+        SearchClient("api_key", transport=FakeServer().transport(), cassette=cassette)
+    with pytest.raises(ValueError):
+        Cassette(path).warm(SearchClient("api_key"))
+
+
+def test_mode():
+    with pytest.raises(ValueError):
+        Cassette("traffic.jsonl.gz", mode="write")
+
+
+@pytest.mark.asyncio
+async def test_async_record_and_replay(tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    with Cassette(path, mode="record") as cassette:
+        client = SearchAsyncClient(
+            "api_key", transport=FakeServer().async_transport(), cassette=cassette
+        )
+        recorded = await client.search_many(["cafe", "bank"])
+        await client.close()
+
+    client = SearchAsyncClient("api_key", cassette=Cassette(path))
+    assert await client.search_many(["bank", "cafe"]) == recorded[::-1]
@@ -0,0 +1,150 @@
+"""
+Tests for request metrics
+"""
+
+import threading
+
+import pytest
+
+from ymaps.cache import MemoryCache
+from ymaps.exceptions import InvalidKey, InvalidParameters
+from ymaps.metrics import MetricsRegistry
+from ymaps.sync import GeocodeClient, SearchClient, StaticClient
+from ymaps.asynchr import SearchAsyncClient
+from ymaps.testing import FakeServer
+
+
+def test_observe():
+    registry = MetricsRegistry(buckets=[0.1, 1])
+    with registry.observe("search", "search"):
+        assert registry.snapshot()["search"]["search"]["in_flight"] == 1
+    with pytest.raises(ValueError):
+        with registry.observe("search", "search"):
+            raise ValueError
+
+    entry = registry.snapshot()["search"]["search"]
+    assert entry["requests"] == 2
+    assert entry["in_flight"] == 0
+    assert entry["exceptions"] == {"ValueError": 1}
+    assert entry["statuses"] == {}
+    assert entry["latency"]["buckets"] == {0.1: 2, 1: 2, float("inf"): 2}
+    assert entry["latency"]["count"] == 2
+
+
+def test_sync_clients(tmp_path):
+    registry = MetricsRegistry()
+    server = FakeServer(api_key="api_key")
+    search = SearchClient("api_key", transport=server.transport(), metrics=registry)
+    geocode = GeocodeClient("api_key", transport=server.transport(), metrics=registry)
+    static = StaticClient("api_key", transport=server.transport(), metrics=registry)
+
+    search.search("cafe")
+    search.prepare(results=5)("bank")
+    with pytest.raises(InvalidParameters):
+        search.search("")
+    geocode.reverse([37.611347, 55.760241])
+    static.load_image(str(tmp_path / "map.png"), ll=[37.620447, 55.753586])
+    with pytest.raises(InvalidKey):
+        GeocodeClient("key", transport=server.transport(), metrics=registry).geocode("Тверь")
+
+    snapshot = registry.snapshot()
+    assert snapshot["search"]["search"]["requests"] == 2
+    assert snapshot["search"]["search"]["statuses"] == {200: 1, 400: 1}
+    assert snapshot["search"]["search"]["exceptions"] == {"InvalidParameters": 1}
+    assert snapshot["search"]["search"]["bytes"] > 0
+    assert snapshot["search"]["prepared"]["requests"] == 1
+    assert snapshot["geocode"]["reverse"]["statuses"] == {200: 1}
+    assert snapshot["geocode"]["geocode"]["exceptions"] == {"InvalidKey": 1}
+    assert snapshot["static"]["load_image"]["bytes"] == server.image_size
+
+
+def test_threads():
+    registry = MetricsRegistry()
+    client = SearchClient(
+        "api_key", transport=FakeServer().transport(), metrics=registry
+    )
+    client.search_many(["cafe {}".format(index) for index in range(20)], concurrency=4)
+    threads = [threading.Thread(target=client.search, args=("bank",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    entry = registry.snapshot()["search"]["search"]
+    assert entry["requests"] == 23
+    assert entry["statuses"] == {200: 23}
+    assert entry["latency"]["count"] == 23
+
+
+def test_shards_of_finished_threads_are_folded():
+    registry = MetricsRegistry()
+    client = SearchClient(
+        "api_key", transport=FakeServer().transport(), metrics=registry
+    )
+    for _ in range(50):
+        client.search_many(["cafe", "bank"], concurrency=2)
+    client.search("cafe")
+    assert len(registry._shards) <= 3
+    assert registry.snapshot()["search"]["search"]["requests"] == 101
+
+
+def test_cache_hits(tmp_path):
+    registry = MetricsRegistry()
+    server = FakeServer()
+    cache = MemoryCache()
+    search = SearchClient(
+        "api_key", transport=server.transport(), metrics=registry, cache=cache
+    )
+    static = StaticClient(
+        "api_key", transport=server.transport(), metrics=registry, cache=cache
+    )
+    for _ in range(3):
+        search.search("cafe")
+    static.get_image(ll=[37.620447, 55.753586])
+    static.load_image(str(tmp_path / "map.png"), ll=[37.620447, 55.753586])
+
+    snapshot = registry.snapshot()
+    entry = snapshot["search"]["search"]
+    assert entry["requests"] == 1
+    assert entry["cache_hits"] == 2
+    assert entry["statuses"] == {200: 1}
+    assert entry["latency"]["count"] == 1
+    assert snapshot["static"]["load_image"]["requests"] == 0
+    assert snapshot["static"]["load_image"]["cache_hits"] == 1
+    assert snapshot["static"]["load_image"]["bytes"] == 0
+    assert server.requests == 2
+    assert 'ymaps_cache_hits_total{service="search",method="search"} 2' in registry.prometheus()
+
+
+def test_prometheus():
+    registry = MetricsRegistry(buckets=[0.5])
+    client = SearchClient(
+        "api_key", transport=FakeServer().transport(), metrics=registry
+    )
+    client.search("cafe")
+
+    text = registry.prometheus()
+    labels = 'service="search",method="search"'
+    assert "# TYPE ymaps_requests_total counter" in text
+    assert "ymaps_requests_total{%s} 1" % labels in text
+    assert 'ymaps_responses_total{%s,status="200"} 1' % labels in text
+    assert 'ymaps_request_duration_seconds_bucket{%s,le="0.5"} 1' % labels in text
+    assert 'ymaps_request_duration_seconds_bucket{%s,le="+Inf"} 1' % labels in text
+    assert "ymaps_request_duration_seconds_count{%s} 1" % labels in text
+    assert "ymaps_requests_in_flight{%s} 0" % labels in text
+    assert text.endswith("\n")
+
+
+@pytest.mark.asyncio
+async def test_async_client():
+    registry = MetricsRegistry()
+    server = FakeServer()
+    client = SearchAsyncClient(
+        "api_key", transport=server.async_transport(), metrics=registry, coalesce=True
+    )
+
+    await client.search_many(["cafe", "cafe", "bank"])
+    entry = registry.snapshot()["search"]["search"]
+    assert entry["requests"] == 3
+    assert entry["statuses"] == {200: 3}
+    assert server.requests == 2
@@ -0,0 +1,150 @@
+"""
+Tests for typed results
+"""
+
+import gc
+import tracemalloc
+
+import pytest
+
+from ymaps.models import GeoObject, SearchFeature
+from ymaps.testing import geocode_response
+
+
+GEOCODE_RESPONSE = {
+    "response": {
+        "GeoObjectCollection": {
+            "featureMember": [
+                {
+                    "GeoObject": {
+                        "metaDataProperty": {
+                            "GeocoderMetaData": {
+                                "precision": "exact",
+                                "text": "Россия, Москва, улица Новый Арбат, 24",
+                                "kind": "house",
+                                "Address": {
+                                    "country_code": "RU",
+                                    "formatted": "Россия, Москва, улица Новый Арбат, 24",
+                                    "postal_code": "119019",
+                                    "Components": [
+                                        {"kind": "country", "name": "Россия"},
+                                        {"kind": "locality", "name": "Москва"},
+                                        {"kind": "street", "name": "улица Новый Арбат"},
+                                        {"kind": "house", "name": "24"},
+                                    ],
+                                },
+                            }
+                        },
+                        "name": "улица Новый Арбат, 24",
+                        "description": "Москва, Россия",
+                        "boundedBy": {
+                            "Envelope": {
+                                "lowerCorner": "37.583508 55.750768",
+                                "upperCorner": "37.591719 55.755398",
+                            }
+                        },
+                        "Point": {"pos": "37.587614 55.753083"},
+                    }
+                }
+            ]
+        }
+    }
+}
+
+SEARCH_RESPONSE = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [37.588144, 55.733842]},
+            "properties": {
+                "name": "Яндекс",
+                "description": "ул. Льва Толстого, 16, Москва, Россия",
+                "boundedBy": [[37.584039, 55.731522], [37.592250, 55.736163]],
+                "CompanyMetaData": {
+                    "name": "Яндекс",
+                    "address": "Москва, ул. Льва Толстого, 16",
+                    "Categories": [{"class": "internet", "name": "IT-компания"}],
+                    "Phones": [{"type": "phone", "formatted": "+7 (495) 739-70-00"}],
+                },
+            },
+        },
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [37.617698, 55.755864]},
+            "properties": {
+                "name": "Москва",
+                "GeocoderMetaData": {"kind": "locality", "text": "Россия, Москва"},
+            },
+        },
+    ],
+}
+
+
+def test_geo_object():
+    (geo_object,) = GeoObject.from_response(GEOCODE_RESPONSE)
+    assert geo_object.name == "улица Новый Арбат, 24"
+    assert geo_object.point == (37.587614, 55.753083)
+    assert geo_object.bounds == ((37.583508, 55.750768), (37.591719, 55.755398))
+    assert geo_object.precision == "exact"
+    assert geo_object.kind == "house"
+    assert geo_object.formatted == "Россия, Москва, улица Новый Арбат, 24"
+    assert geo_object.postal_code == "119019"
+    assert geo_object.address_components[-2:] == (
+        ("street", "улица Новый Арбат"),
+        ("house", "24"),
+    )
+
+
+def test_geo_object_is_lazy():
+    (geo_object,) = GeoObject.from_response(GEOCODE_RESPONSE)
+    assert not hasattr(geo_object, "__dict__")
+    assert not hasattr(geo_object, "_point")
+    point = geo_object.point
+    assert geo_object.point is point
+
+
+def test_geo_object_is_smaller_than_response():
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        response = geocode_response(10000)
+        response_size = tracemalloc.get_traced_memory()[0] - start
+        objects = GeoObject.from_response(response)
+        del response
+        gc.collect()
+        objects_size = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    assert len(objects) == 10000
+    assert objects_size < response_size / 2
+
+
+def test_keep_raw():
+    member = GEOCODE_RESPONSE["response"]["GeoObjectCollection"]["featureMember"][0]
+    (geo_object,) = GeoObject.from_response(GEOCODE_RESPONSE)
+    assert geo_object.raw is None
+    with pytest.raises(ValueError):
+        geo_object.metadata
+    (geo_object,) = GeoObject.from_response(GEOCODE_RESPONSE, keep_raw=True)
+    assert geo_object.raw is member["GeoObject"]
+    assert geo_object.address["postal_code"] == "119019"
+    company, _ = SearchFeature.from_response(SEARCH_RESPONSE, keep_raw=True)
+    assert company.properties["name"] == "Яндекс"
+
+
+def test_search_features():
+    company, toponym = SearchFeature.from_response(SEARCH_RESPONSE)
+    assert company.is_company
+    assert company.point == (37.588144, 55.733842)
+    assert company.bounds == ((37.584039, 55.731522), (37.59225, 55.736163))
+    assert company.formatted == "Москва, ул. Льва Толстого, 16"
+    assert company.categories == ("IT-компания",)
+    assert company.phones == ("+7 (495) 739-70-00",)
+
+    assert not toponym.is_company
+    assert toponym.kind == "locality"
+    assert toponym.formatted == "Россия, Москва"
+    assert toponym.bounds is None
+    assert toponym.categories == ()
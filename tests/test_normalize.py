@@ -0,0 +1,96 @@
+"""
+Tests for address normalization and duplicate elimination
+"""
+
+import csv
+import json
+
+import pytest
+
+from ymaps.asynchr import GeocodeAsyncClient
+from ymaps.bulk import geocode_file
+from ymaps.normalize import Deduplicator, normalize_address
+from ymaps.sync import GeocodeClient
+from ymaps.testing import FakeServer
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Москва, ул. Тверская, д.7", "москва улица тверская дом 7"),
+        ("  МОСКВА   улица Тверская дом 7 ", "москва улица тверская дом 7"),
+        ("г. Королёв, пр-т Космонавтов, 1/2", "город королев проспект космонавтов 1/2"),
+        ("Казань, ул. Баумана, д. 5, корп. 2 -", "казань улица баумана дом 5 корпус 2"),
+        ("", ""),
+    ],
+)
+def test_normalize_address(text, expected):
+    assert normalize_address(text) == expected
+
+
+def test_group():
+    deduplicator = Deduplicator()
+    unique, positions = deduplicator.group(
+        [
+            "Москва, ул. Тверская, д.7",
+            "Казань",
+            "москва улица тверская дом 7",
+            [37.6, 55.7],
+            (37.6, 55.7),
+        ]
+    )
+    assert unique == ["Москва, ул. Тверская, д.7", "Казань", [37.6, 55.7]]
+    assert positions == [0, 1, 0, 2, 2]
+    deduplicator.group(["Казань"])
+    assert deduplicator.stats == {
+        "queries": 6, "requests": 4, "saved": 2, "saved_ratio": 2 / 6
+    }
+    assert Deduplicator().stats["saved_ratio"] == 0.0
+
+
+def test_geocode_many():
+    server = FakeServer()
+    client = GeocodeClient("api_key", transport=server.transport())
+    deduplicator = Deduplicator()
+    results = client.geocode_many(
+        ["Москва, ул. Тверская, д.7", "Казань", "МОСКВА улица Тверская дом 7"],
+        deduplicator=deduplicator,
+    )
+    assert server.requests == 2
+    assert results[0] == results[2]
+    assert deduplicator.stats["saved"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_reverse_many():
+    server = FakeServer()
+    client = GeocodeAsyncClient("api_key", transport=server.async_transport())
+    results = await client.reverse_many(
+        [[37.6, 55.7], [30.3, 59.9], (37.6, 55.7)], deduplicator=Deduplicator()
+    )
+    await client.close()
+    assert server.requests == 2
+    assert results[0] == results[2]
+
+
+@pytest.mark.asyncio
+async def test_geocode_file(tmp_path):
+    input_path, output_path = str(tmp_path / "in.csv"), str(tmp_path / "out.jsonl")
+    addresses = ["Москва, ул. Тверская, д.7", "Казань", "москва улица тверская дом 7", ""] * 3
+    with open(input_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["address"])
+        writer.writerows([address] for address in addresses)
+    server = FakeServer()
+    client = GeocodeAsyncClient("api_key", transport=server.async_transport())
+
+    stats = await geocode_file(
+        client, input_path, output_path, concurrency=4, deduplicator=Deduplicator()
+    )
+    await client.close()
+    with open(output_path, encoding="utf-8") as file:
+        rows = [json.loads(line) for line in file]
+    assert server.requests == 2
+    assert stats == {"rows": 12, "skipped": 0, "geocoded": 9, "errors": 3, "deduplicated": 7}
+    assert [row["address"] for row in rows] == addresses
+    assert rows[0]["formatted"] == rows[2]["formatted"] == rows[10]["formatted"]
@@ -0,0 +1,84 @@
+"""
+Tests for auto-paginating iterators
+"""
+
+import asyncio
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from ymaps.sync import GeocodeClient, SearchClient
+from ymaps.asynchr import GeocodeAsyncClient, SearchAsyncClient
+
+
+def search_pages(found):
+    def callback(request: httpx.Request):
+        results = int(request.url.params["results"])
+        skip = int(request.url.params["skip"])
+        features = [{"id": index} for index in range(skip, min(found, skip + results))]
+        return httpx.Response(
+            200,
+            json={
+                "properties": {"ResponseMetaData": {"SearchResponse": {"found": found}}},
+                "features": features,
+            },
+        )
+
+    return callback
+
+
+def geocode_pages(found):
+    def callback(request: httpx.Request):
+        results = int(request.url.params["results"])
+        skip = int(request.url.params["skip"])
+        members = [{"id": index} for index in range(skip, min(found, skip + results))]
+        collection = {
+            "metaDataProperty": {"GeocoderResponseMetaData": {"found": str(found)}},
+            "featureMember": members,
+        }
+        return httpx.Response(200, json={"response": {"GeoObjectCollection": collection}})
+
+    return callback
+
+
+def test_iter_search(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(search_pages(found=25), is_reusable=True)
+    features = list(SearchClient("api_key").iter_search("cafe", results=10))
+    assert [feature["id"] for feature in features] == list(range(25))
+    assert len(httpx_mock.get_requests()) == 3
+
+
+def test_iter_search_stops_at_found(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(search_pages(found=20), is_reusable=True)
+    features = list(SearchClient("api_key").iter_search("cafe", results=10))
+    assert len(features) == 20
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_iter_geocode(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(geocode_pages(found=7), is_reusable=True)
+    members = GeocodeClient("api_key").iter_geocode("Moscow", results=5, skip=5)
+    assert [member["id"] for member in members] == [5, 6]
+
+
+def test_iter_checks_skip():
+    with pytest.raises(ValueError):
+        next(SearchClient("api_key").iter_search("cafe", results=10, skip=5))
+
+
+@pytest.mark.asyncio
+async def test_async_iter_search(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(search_pages(found=25), is_reusable=True)
+    client = SearchAsyncClient("api_key")
+    features = [feature async for feature in client.iter_search("cafe", results=10)]
+    assert [feature["id"] for feature in features] == list(range(25))
+
+
+@pytest.mark.asyncio
+async def test_async_iter_geocode_prefetches_next_page(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(geocode_pages(found=100), is_reusable=True)
+    members = GeocodeAsyncClient("api_key").iter_geocode("Moscow", results=10)
+    assert (await members.__anext__())["id"] == 0
+    await asyncio.sleep(0.01)
+    assert len(httpx_mock.get_requests()) == 2
+    await members.aclose()
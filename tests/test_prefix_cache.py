@@ -0,0 +1,104 @@
+"""
+Tests for the prefix trie cache of suggestions
+"""
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from ymaps.prefix_cache import PrefixCache
+from ymaps.sync import SuggestClient
+from ymaps.asynchr import SuggestAsyncClient
+
+
+def suggestion(title, subtitle=""):
+    return {"title": {"text": title}, "subtitle": {"text": subtitle}}
+
+
+SAINT_PETERSBURG = {
+    "results": [
+        suggestion("Санкт-Петербург", "Россия"),
+        suggestion("Санкт-Петербургский проспект", "Петергоф"),
+        suggestion("Санкт-Вольфганг", "Австрия"),
+    ]
+}
+
+
+def test_exact_hit():
+    cache = PrefixCache()
+    assert cache.get({"text": "санкт", "lang": "ru"}) is None
+    cache.set({"text": "санкт", "lang": "ru"}, SAINT_PETERSBURG)
+    assert cache.get({"text": "  Санкт ", "lang": "ru"}) is SAINT_PETERSBURG
+    assert cache.get({"text": "санкт", "lang": "en"}) is None
+    assert cache.get({"text": "санкт", "lang": "ru", "ll": "37.6,55.7"}) is None
+    assert cache.stats == {"hits": 1, "filtered_hits": 0, "misses": 3, "entries": 1}
+
+
+def test_filtered_prefix_hit():
+    cache = PrefixCache(filter_prefixes=True)
+    cache.set({"text": "санкт"}, SAINT_PETERSBURG)
+    actual = cache.get({"text": "санкт-петербургский"})
+    assert actual["results"] == [suggestion("Санкт-Петербургский проспект", "Петергоф")]
+    actual = cache.get({"text": "санкт австрия"})
+    assert actual["results"] == [suggestion("Санкт-Вольфганг", "Австрия")]
+    assert cache.filtered_hits == 2
+
+
+def test_incomplete_prefix_is_not_filtered():
+    cache = PrefixCache(filter_prefixes=True)
+    cache.set({"text": "санкт", "results": 3}, SAINT_PETERSBURG)
+    assert cache.get({"text": "санкт-п", "results": 3}) is None
+
+
+def test_eviction_removes_subtree():
+    cache = PrefixCache(max_entries=2)
+    cache.set({"text": "са"}, SAINT_PETERSBURG)
+    cache.set({"text": "санкт"}, SAINT_PETERSBURG)
+    cache.set({"text": "мо"}, SAINT_PETERSBURG)
+    assert len(cache) == 1
+    assert cache.get({"text": "санкт"}) is None
+    assert cache.get({"text": "мо"}) is not None
+
+
+def test_eviction_removes_empty_contexts():
+    cache = PrefixCache(max_entries=1)
+    for index in range(1000):
+        cache.set({"text": "санкт", "ll": "37.6,{}".format(index)}, SAINT_PETERSBURG)
+    assert len(cache) == 1
+    assert len(cache._roots) == 1
+
+
+def test_sync_client_prefix_cache(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json=SAINT_PETERSBURG)
+    client = SuggestClient("api_key", prefix_cache=PrefixCache(filter_prefixes=True))
+    assert client.suggest("санкт") == SAINT_PETERSBURG
+    assert len(client.suggest("санкт-п")["results"]) == 2
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_prefix_cache(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json=SAINT_PETERSBURG, is_reusable=True)
+    client = SuggestAsyncClient("api_key", prefix_cache=PrefixCache())
+    assert await client.suggest("санкт") == SAINT_PETERSBURG
+    assert await client.suggest("санкт") == SAINT_PETERSBURG
+    await client.suggest("санкт", lang="en")
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_sync_prepared_prefix_cache(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json=SAINT_PETERSBURG)
+    client = SuggestClient("api_key", prefix_cache=PrefixCache(filter_prefixes=True))
+    suggest = client.prepare(lang="ru")
+    assert suggest("санкт") == SAINT_PETERSBURG
+    assert len(client.suggest("санкт-п", lang="ru")["results"]) == 2
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_prepared_prefix_cache(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json=SAINT_PETERSBURG)
+    client = SuggestAsyncClient("api_key", prefix_cache=PrefixCache())
+    suggest = client.prepare()
+    assert await client.suggest("санкт") == SAINT_PETERSBURG
+    assert await suggest("санкт") == SAINT_PETERSBURG
+    assert len(httpx_mock.get_requests()) == 1
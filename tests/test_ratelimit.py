@@ -0,0 +1,62 @@
+"""
+Tests for client-side rate limiting
+"""
+
+import pytest
+from unittest import mock
+from pytest_httpx import HTTPXMock
+
+from ymaps.ratelimit import RateLimiter, TokenBucket
+from ymaps.sync import GeocodeClient
+from ymaps.asynchr import SearchAsyncClient
+
+
+@mock.patch("ymaps.ratelimit.time.monotonic", return_value=0)
+def test_token_bucket_reserve(monotonic):
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1)
+    assert bucket.reserve() == pytest.approx(0.2)
+
+    monotonic.return_value = 1
+    assert bucket.reserve() == 0
+
+
+@mock.patch("ymaps.ratelimit.time.monotonic", return_value=0)
+def test_token_bucket_slow_rate(monotonic):
+    bucket = TokenBucket(rate=0.5)
+    assert bucket.capacity == 1
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(2)
+
+
+def test_rate_limiter_rates():
+    limiter = RateLimiter(10, service_rate={"geocode": 20}, key_rate={"premium": 50})
+    assert limiter.get_bucket("search", "api_key").rate == 10
+    assert limiter.get_bucket("geocode", "api_key").rate == 20
+    assert limiter.get_bucket("geocode", "premium").rate == 50
+    assert limiter.get_bucket("search", "api_key") is limiter.get_bucket(
+        "search", "api_key"
+    )
+
+
+@mock.patch("ymaps.ratelimit.time.sleep")
+def test_sync_client_waits_for_token(sleep, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={}, is_reusable=True)
+    client = GeocodeClient("api_key", rate_limiter=RateLimiter(1, burst=1))
+    client.geocode("Moscow")
+    sleep.assert_not_called()
+    client.geocode("Kazan")
+    sleep.assert_called_once()
+
+
+@pytest.mark.asyncio
+@mock.patch("ymaps.ratelimit.asyncio.sleep")
+async def test_async_client_waits_for_token(sleep, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={}, is_reusable=True)
+    client = SearchAsyncClient("api_key", rate_limiter=RateLimiter(1, burst=1))
+    await client.search("cafe")
+    sleep.assert_not_called()
+    await client.search("bank")
+    sleep.assert_awaited_once()
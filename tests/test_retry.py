@@ -0,0 +1,112 @@
+"""
+Tests for the retry policy
+"""
+
+import httpx
+import pytest
+from unittest import mock
+from pytest_httpx import HTTPXMock
+
+from ymaps.exceptions import InvalidKey, UnexpectedResponse
+from ymaps.retry import RetryBudget, RetryPolicy
+from ymaps.ratelimit import RateLimiter
+from ymaps.sync import GeocodeClient, StaticClient
+from ymaps.asynchr import SearchAsyncClient, StaticAsyncClient
+
+
+def test_retry_policy_rejects_client_errors():
+    with pytest.raises(ValueError):
+        RetryPolicy(statuses=[403, 503])
+
+
+def test_retry_policy_should_retry():
+    policy = RetryPolicy(attempts=2)
+    assert policy.should_retry(0, response=httpx.Response(503))
+    assert policy.should_retry(0, exception=httpx.ConnectTimeout("timeout"))
+    assert not policy.should_retry(0, response=httpx.Response(400))
+    assert not policy.should_retry(0, exception=ValueError())
+    assert not policy.should_retry(1, response=httpx.Response(503))
+
+
+def test_retry_policy_delay():
+    policy = RetryPolicy(backoff=1, max_backoff=5)
+    for attempt in range(5):
+        assert 0 <= policy.get_delay(attempt) <= min(5, 2**attempt)
+    assert policy.get_delay(0, httpx.Response(429, headers={"Retry-After": "3"})) == 3
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.1, reserve=2)
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    for _ in range(11):
+        budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+
+@mock.patch("ymaps.sync.time.sleep")
+def test_sync_client_retries(sleep, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=503)
+    httpx_mock.add_exception(httpx.ReadTimeout("timeout"))
+    httpx_mock.add_response(json={"request": "Moscow"})
+    client = GeocodeClient("api_key", retry=RetryPolicy(attempts=3))
+    assert client.geocode("Moscow") == {"request": "Moscow"}
+    assert sleep.call_count == 2
+
+
+@mock.patch("ymaps.sync.time.sleep")
+def test_sync_client_gives_up(sleep, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=503, is_reusable=True)
+    client = GeocodeClient("api_key", retry=RetryPolicy(attempts=2))
+    with pytest.raises(UnexpectedResponse):
+        client.geocode("Moscow")
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_sync_client_does_not_retry_invalid_key(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=403)
+    client = GeocodeClient("api_key", retry=RetryPolicy())
+    with pytest.raises(InvalidKey):
+        client.geocode("Moscow")
+
+
+@pytest.mark.asyncio
+@mock.patch("ymaps.asynchr.asyncio.sleep")
+async def test_async_client_retries_within_budget(sleep, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=429, is_reusable=True)
+    policy = RetryPolicy(attempts=5, budget=RetryBudget(reserve=1))
+    client = SearchAsyncClient("api_key", retry=policy)
+    with pytest.raises(UnexpectedResponse):
+        await client.search("cafe")
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@mock.patch("ymaps.sync.time.sleep")
+def test_sync_load_image_retries(sleep, httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_response(status_code=503)
+    httpx_mock.add_response(content=b"image")
+    limiter = RateLimiter(100, burst=1)
+    client = StaticClient("api_key", retry=RetryPolicy(attempts=2), rate_limiter=limiter)
+    with mock.patch.object(limiter, "acquire", wraps=limiter.acquire) as acquire:
+        path = client.load_image(str(tmp_path / "map.png"), ll=[37.620447, 55.753586])
+    with open(path, "rb") as file:
+        assert file.read() == b"image"
+    assert len(httpx_mock.get_requests()) == 2
+    assert acquire.call_count == 2
+
+
+@pytest.mark.asyncio
+@mock.patch("ymaps.asynchr.asyncio.sleep")
+async def test_async_load_image_retries(sleep, httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_response(status_code=503)
+    httpx_mock.add_response(content=b"image")
+    limiter = RateLimiter(100, burst=1)
+    client = StaticAsyncClient("api_key", retry=RetryPolicy(attempts=2), rate_limiter=limiter)
+    with mock.patch.object(limiter, "acquire_async", wraps=limiter.acquire_async) as acquire:
+        path = await client.load_image(str(tmp_path / "map.png"), ll=[37.620447, 55.753586])
+    with open(path, "rb") as file:
+        assert file.read() == b"image"
+    assert len(httpx_mock.get_requests()) == 2
+    assert acquire.call_count == 2
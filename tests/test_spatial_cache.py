@@ -0,0 +1,99 @@
+"""
+Tests for the spatial cache of reverse geocoding results
+"""
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from ymaps.spatial_cache import ReverseCache
+from ymaps.sync import GeocodeClient
+from ymaps.asynchr import GeocodeAsyncClient
+
+
+def params(lon, lat, **other):
+    return {"geocode": "{},{}".format(lon, lat), "format": "json", **other}
+
+
+def test_hit_within_tolerance():
+    cache = ReverseCache()
+    cache.set(params(37.611347, 55.760241, kind="house"), "house")
+    # about 5 meters to the north east
+    assert cache.get(params(37.611400, 55.760280, kind="house")) == "house"
+    # about 60 meters to the north
+    assert cache.get(params(37.611347, 55.760780, kind="house")) is None
+    assert cache.stats == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+def test_tolerance_depends_on_kind():
+    cache = ReverseCache(tolerance={"street": 100})
+    cache.set(params(37.611347, 55.760241, kind="street"), "street")
+    assert cache.get(params(37.611347, 55.760780, kind="street")) == "street"
+    assert cache.get(params(37.611347, 55.760241, kind="house")) is None
+
+
+def test_hit_across_cell_border():
+    cache = ReverseCache(tolerance={None: 10})
+    cache.set(params(0.0, 0.00004), "result")
+    assert cache.get(params(0.0, -0.00004)) == "result"
+
+
+def test_latlong_order():
+    cache = ReverseCache()
+    cache.set(params(37.611347, 55.760241), "result")
+    assert cache.get(params(55.760241, 37.611347, sco="latlong")) == "result"
+    assert cache.get(params(55.760241, 37.611347)) is None
+
+
+def test_returns_nearest_result():
+    cache = ReverseCache(tolerance={None: 50})
+    cache.set(params(37.6110, 55.7600), "first")
+    cache.set(params(37.6113, 55.7600), "second")
+    assert cache.get(params(37.6112, 55.7600)) == "second"
+
+
+def test_eviction():
+    cache = ReverseCache(max_entries=1)
+    cache.set(params(37.61, 55.76), "first")
+    cache.set(params(30.30, 59.95), "second")
+    assert len(cache) == 1
+    assert cache.get(params(37.61, 55.76)) is None
+    assert cache._cells.keys() == {next(iter(cache._entries.values()))[0]}
+
+
+def test_sync_client_reverse_cache(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={"request": "house"})
+    client = GeocodeClient("api_key", reverse_cache=ReverseCache())
+    assert client.reverse([37.611347, 55.760241], kind="house") == {"request": "house"}
+    assert client.reverse([37.611350, 55.760245], kind="house") == {"request": "house"}
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_reverse_cache(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={"request": "house"}, is_reusable=True)
+    cache = ReverseCache()
+    client = GeocodeAsyncClient("api_key", reverse_cache=cache)
+    await client.reverse([37.611347, 55.760241])
+    await client.reverse([37.611347, 55.760241], lang="en_US")
+    await client.reverse([37.611347, 55.760241])
+    assert len(httpx_mock.get_requests()) == 2
+    assert cache.hits == 1
+
+
+def test_sync_prepared_reverse_cache(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={"request": "house"})
+    client = GeocodeClient("api_key", reverse_cache=ReverseCache())
+    reverse = client.prepare(kind="house")
+    assert client.reverse([37.611347, 55.760241], kind="house") == {"request": "house"}
+    assert reverse([37.611350, 55.760245]) == {"request": "house"}
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_prepared_reverse_cache(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={"request": "house"})
+    client = GeocodeAsyncClient("api_key", reverse_cache=ReverseCache())
+    reverse = client.prepare(kind="house")
+    assert await reverse([37.611347, 55.760241]) == {"request": "house"}
+    assert await client.reverse([37.611350, 55.760245], kind="house") == {"request": "house"}
+    assert len(httpx_mock.get_requests()) == 1
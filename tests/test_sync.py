@@ -2,6 +2,10 @@
 Tests for synchronous Yandex Maps API client
 """
 
+import os
+import stat
+
+import httpx
 import pytest
 from unittest import mock
 from pytest_httpx import HTTPXMock
@@ -50,6 +54,25 @@ def test_init_static_client():
     assert static._client.timeout.read == 10
 
 
+def test_shared_transport():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+    transport.close = mock.Mock()
+    search = SearchClient("api_key", transport=transport)
+    geocode = GeocodeClient("api_key", transport=transport)
+    assert search.search("cafe") == {}
+    search.close()
+    assert geocode.geocode("Moscow") == {}
+    transport.close.assert_not_called()
+
+
+def test_client_limits():
+    limits = httpx.Limits(max_connections=5, keepalive_expiry=30)
+    with mock.patch("ymaps.sync.Client", autospec=True) as client:
+        GeocodeClient("api_key", limits=limits, http2=True)
+    assert client.call_args.kwargs["limits"] is limits
+    assert client.call_args.kwargs["http2"] is True
+
+
 # search testing
 
 
@@ -91,6 +114,14 @@ def test_search_by_all_parameters(httpx_mock: HTTPXMock):
     assert actual == expected
 
 
+def test_custom_json_loads(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={"request": "cafe"})
+    json_loads = mock.Mock(return_value={"decoded": True})
+    actual = SearchClient("api_key", json_loads=json_loads).search("cafe")
+    assert actual == {"decoded": True}
+    json_loads.assert_called_once_with(b'{"request":"cafe"}')
+
+
 # geocode testing
 
 
@@ -294,6 +325,165 @@ def test_get_image_by_all_parameters(httpx_mock: HTTPXMock):
     assert actual.decode() == f'"{expected}"'
 
 
+# batch testing
+
+
+def test_geocode_many(httpx_mock: HTTPXMock):
+    requests = ["Moscow", "Kazan", "Omsk"]
+    for request in requests:
+        httpx_mock.add_response(
+            method="GET",
+            url=f"{GeocodeClient.BASE_URL}?apikey=api_key&lang=ru_RU&"
+            f"format=json&geocode={request}",
+            json={"request": request},
+        )
+    actual = GeocodeClient("api_key").geocode_many(requests, concurrency=2)
+    assert actual == [{"request": request} for request in requests]
+
+
+@pytest.mark.parametrize("concurrency", [0, -1])
+def test_geocode_many_invalid_concurrency(concurrency):
+    with pytest.raises(ValueError):
+        GeocodeClient("api_key").geocode_many(["Moscow"], concurrency=concurrency)
+
+
+def test_geocode_many_returns_errors_per_item(httpx_mock: HTTPXMock):
+    url = f"{GeocodeClient.BASE_URL}?apikey=api_key&lang=ru_RU&format=json"
+    httpx_mock.add_response(url=f"{url}&geocode=Moscow", json={"request": "Moscow"})
+    httpx_mock.add_response(url=f"{url}&geocode=", status_code=400)
+    httpx_mock.add_response(url=f"{url}&geocode=Omsk", json={"request": "Omsk"})
+
+    actual = GeocodeClient("api_key").geocode_many(["Moscow", "", "Omsk"])
+    assert actual[0] == {"request": "Moscow"}
+    assert isinstance(actual[1], InvalidParameters)
+    assert actual[2] == {"request": "Omsk"}
+
+
+def test_reverse_many(httpx_mock: HTTPXMock):
+    requests = [[37.611347, 55.760241], [30.301324, 59.951921]]
+    for request in requests:
+        httpx_mock.add_response(
+            method="GET",
+            url=f"{GeocodeClient.BASE_URL}?apikey=api_key&lang=ru_RU&"
+            f"geocode={request[0]},{request[1]}&format=json&kind=house",
+            json={"request": request},
+        )
+    actual = GeocodeClient("api_key").reverse_many(requests, kind="house")
+    assert actual == [{"request": request} for request in requests]
+
+
+def test_search_many(httpx_mock: HTTPXMock):
+    requests = ["cafe", "bank"]
+    for request in requests:
+        httpx_mock.add_response(
+            method="GET",
+            url=f"{SearchClient.BASE_URL}?apikey=api_key&lang=ru_RU&text={request}",
+            json={"request": request},
+        )
+    actual = SearchClient("api_key").search_many(iter(requests))
+    assert actual == [{"request": request} for request in requests]
+
+
+def test_suggest_many(httpx_mock: HTTPXMock):
+    requests = ["санкт", "моск"]
+    for request in requests:
+        httpx_mock.add_response(
+            method="GET",
+            url=f"{SuggestClient.BASE_URL}?apikey=api_key&lang=ru&text={request}",
+            json={"request": request},
+        )
+    actual = SuggestClient("api_key").suggest_many(requests, concurrency=1)
+    assert actual == [{"request": request} for request in requests]
+
+
+# load_image testing
+
+
+def test_load_image(httpx_mock: HTTPXMock, tmp_path):
+    request = [37.611347, 55.760241]
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{StaticClient.BASE_URL}?apikey=api_key&lang=ru_RU&ll={request[0]},{request[1]}",
+        content=b"image" * 100000,
+    )
+    path = str(tmp_path / "map.png")
+    actual = StaticClient("api_key").load_image(path, ll=request)
+    assert actual == path
+    with open(path, "rb") as file:
+        assert file.read() == b"image" * 100000
+    assert [item.name for item in tmp_path.iterdir()] == ["map.png"]
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~umask
+
+
+def test_load_image_error(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_response(status_code=400)
+    with pytest.raises(InvalidParameters):
+        StaticClient("api_key").load_image(str(tmp_path / "map.png"), ll=[0, 0])
+    assert list(tmp_path.iterdir()) == []
+
+
+# prepared requests testing
+
+
+def test_prepared_search(httpx_mock: HTTPXMock):
+    for request in ["cafe", "bank"]:
+        httpx_mock.add_response(
+            method="GET",
+            url=f"{SearchClient.BASE_URL}?apikey=api_key&lang=ru_RU&text={request}&"
+            f"ll=37.61892,55.756994&spn=0.552069,0.400552&rspn=1&results=5",
+            json={"request": request},
+        )
+    search = SearchClient("api_key").prepare(
+        ll=[37.61892, 55.756994], spn=[0.552069, 0.400552], rspn=True, results=5
+    )
+    assert search("cafe") == {"request": "cafe"}
+    assert search("bank") == {"request": "bank"}
+    assert httpx_mock.get_requests()[0].extensions["timeout"]["read"] == 1
+
+
+def test_prepared_reverse(httpx_mock: HTTPXMock):
+    request = [37.611347, 55.760241]
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{GeocodeClient.BASE_URL}?apikey=api_key&lang=ru_RU&"
+        f"geocode={request[0]},{request[1]}&format=json&kind=house",
+        json={"request": request},
+    )
+    reverse = GeocodeClient("api_key").prepare(kind="house")
+    assert reverse(request) == {"request": request}
+
+
+def request_url(request):
+    url = request.url
+    return url.copy_with(query=None), sorted(url.params.multi_items())
+
+
+@pytest.mark.parametrize("url", ["v1", "1.x"])
+def test_prepared_url_matches_get(httpx_mock: HTTPXMock, url):
+    httpx_mock.add_response(json={}, is_reusable=True)
+    search = SearchClient("api_key")
+    search.search("cafe", results=5)
+    search.prepare(results=5)("cafe")
+    geocode = GeocodeClient("api_key")
+    geocode.geocode("Москва", kind="house")
+    geocode.prepare(kind="house")("Москва")
+    geocode.reverse([37.611347, 55.760241])
+    geocode.prepare()([37.611347, 55.760241])
+    suggest = SuggestClient("api_key")
+    suggest.suggest("санкт", results=3)
+    suggest.prepare(results=3)("санкт")
+    static = StaticClient("api_key", url=url)
+    static.get_image(ll=[37.620447, 55.753586], z=10)
+    static.prepare(z=10)([37.620447, 55.753586])
+
+    requests = httpx_mock.get_requests()
+    for unprepared, prepared in zip(requests[::2], requests[1::2]):
+        assert request_url(prepared) == request_url(unprepared)
+    assert requests[-1].url.path == ("/1.x/" if url == "1.x" else "/v1")
+
+
 # testing context manager
 
 
@@ -0,0 +1,106 @@
+"""
+Tests for the fake Yandex Maps API
+"""
+
+import random
+
+import pytest
+
+from ymaps.exceptions import InvalidKey, InvalidParameters, UnexpectedResponse
+from ymaps.retry import RetryPolicy
+from ymaps.sync import GeocodeClient, SearchClient, StaticClient
+from ymaps.asynchr import GeocodeAsyncClient, SuggestAsyncClient
+from ymaps.testing import Burst, FakeServer, constant, lognormal, uniform
+
+
+def test_search():
+    server = FakeServer(found=25)
+    client = SearchClient("api_key", transport=server.transport())
+
+    response = client.search("cafe", results=10, skip=20)
+    found = response["properties"]["ResponseMetaData"]["SearchResponse"]["found"]
+    assert len(response["features"]) == 5
+    assert found == 25
+    assert len(list(client.iter_search("cafe", results=10))) == 25
+
+
+def test_geocode():
+    client = GeocodeClient("api_key", transport=FakeServer().transport())
+
+    response = client.reverse([37.611347, 55.760241], results=3)
+    assert len(response["response"]["GeoObjectCollection"]["featureMember"]) == 3
+
+
+def test_static():
+    server = FakeServer(image_size=1000)
+    client = StaticClient(transport=server.transport())
+
+    image = client.get_image(ll=[37.620447, 55.753586], z=10)
+    assert len(image) == 1000
+    assert image.startswith(b"\x89PNG")
+
+
+def test_errors():
+    server = FakeServer(api_key="api_key")
+
+    with pytest.raises(InvalidKey):
+        SearchClient("other_key", transport=server.transport()).search("cafe")
+    with pytest.raises(InvalidParameters):
+        SearchClient("api_key", transport=server.transport()).search("")
+    assert server.statuses == {403: 1, 400: 1}
+
+
+def test_error_rate():
+    server = FakeServer(error_rate=1.0, error_status=503)
+    client = SearchClient("api_key", transport=server.transport())
+
+    with pytest.raises(UnexpectedResponse):
+        client.search("cafe")
+    assert server.statuses == {503: 1}
+
+
+def test_burst():
+    burst = Burst(every=4, length=2, retry_after=0)
+    assert [burst.is_limited(number) for number in range(8)] == [
+        False, False, True, True, False, False, True, True
+    ]
+    with pytest.raises(ValueError):
+        Burst(every=2, length=3)
+
+    server = FakeServer(burst=burst)
+    retry = RetryPolicy(attempts=3, backoff=0)
+    client = SearchClient("api_key", transport=server.transport(), retry=retry)
+    for _ in range(3):
+        client.search("cafe")
+    assert server.statuses == {200: 3, 429: 2}
+
+
+def test_latency():
+    generator = random.Random(0)
+    assert constant(0.1)(generator) == 0.1
+    assert 0.1 <= uniform(0.1, 0.2)(generator) <= 0.2
+    delays = sorted(lognormal(0.05, 0.5)(generator) for _ in range(1000))
+    assert 0.04 < delays[500] < 0.06
+
+
+def test_path_prefix():
+    server = FakeServer()
+    response = server.respond("localhost:8000", "/geocode/1.x", {"apikey": "key"})[1]
+    assert response.status_code == 400
+    assert response.json()["message"] == "Parameter geocode is required"
+    assert server.respond("localhost:8000", "/other", {})[1].status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_async_clients():
+    server = FakeServer(latency=constant(0.01))
+    geocode = GeocodeAsyncClient("api_key", transport=server.async_transport())
+    suggest = SuggestAsyncClient("api_key", transport=server.async_transport())
+
+    responses = await geocode.geocode_many(["Москва", "Тверь"], results=2)
+    assert [
+        len(response["response"]["GeoObjectCollection"]["featureMember"])
+        for response in responses
+    ] == [2, 2]
+    assert len((await suggest.suggest("моск", results=4))["results"]) == 4
+    assert server.requests == 3
@@ -0,0 +1,68 @@
+"""
+Tests for static map tile prefetching
+"""
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from ymaps.asynchr import StaticAsyncClient
+from ymaps.tiles import (
+    TilePrefetcher,
+    TileStore,
+    lonlat_to_pixel,
+    pixel_to_lonlat,
+    tile_center,
+    tiles_in_bbox,
+)
+
+
+def test_projection_round_trip():
+    x, y = lonlat_to_pixel(37.620070, 55.753630, 10)
+    lon, lat = pixel_to_lonlat(x, y, 10)
+    assert lon == pytest.approx(37.620070)
+    assert lat == pytest.approx(55.753630)
+
+
+def test_projection_is_elliptical():
+    # Moscow tile at zoom 10 differs from the spherical Mercator tile (619, 320)
+    x, y = lonlat_to_pixel(37.620070, 55.753630, 10)
+    assert (int(x // 256), int(y // 256)) == (619, 321)
+
+
+def test_tiles_in_bbox():
+    assert list(tiles_in_bbox([-180, -85, 180, 85], 1)) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    tiles = list(tiles_in_bbox([37.6, 55.7, 37.7, 55.8], 12))
+    assert len(tiles) == len(set(tiles)) == 6
+    for x, y in tiles:
+        lon, lat = tile_center(x, y, 12)
+        assert 37.5 < lon < 37.8
+        assert 55.6 < lat < 55.9
+
+
+def test_tile_store(tmp_path):
+    store = TileStore(str(tmp_path / "tiles.db"))
+    assert store.get(10, 619, 321, "map") is None
+    store.put(10, 619, 321, "map", b"image")
+    assert store.get(10, 619, 321, "map") == b"image"
+    assert store.contains(10, 619, 321, "map")
+    assert not store.contains(10, 619, 321, "sat")
+    assert len(store) == 1
+
+
+@pytest.mark.asyncio
+async def test_prefetch(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_response(content=b"image", is_reusable=True)
+    store = TileStore(str(tmp_path / "tiles.db"))
+    prefetcher = TilePrefetcher(StaticAsyncClient("api_key"), store, concurrency=2)
+    bbox = [37.6, 55.7, 37.7, 55.8]
+
+    stats = await prefetcher.prefetch(bbox, range(11, 13), layer="sat", l=["sat"])
+    assert stats == {"fetched": 10, "skipped": 0, "failed": 0}
+    assert len(store) == 10
+
+    request = httpx_mock.get_requests()[0]
+    assert request.url.params["size"] == "256,256"
+    assert request.url.params["l"] == "sat"
+
+    stats = await prefetcher.prefetch(bbox, [12], layer="sat")
+    assert stats == {"fetched": 0, "skipped": 6, "failed": 0}
@@ -0,0 +1,133 @@
+"""
+Tests for request tracing
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ymaps.exceptions import InvalidKey
+from ymaps.sync import GeocodeClient, SearchClient
+from ymaps.asynchr import GeocodeAsyncClient, SearchAsyncClient
+from ymaps.testing import FakeServer
+from ymaps.tracing import Trace, collect_traces
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"features": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}/v1".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def test_phases():
+    trace = Trace("search", "search")
+    trace.events = [
+        ("ymaps.collect.started", 0.0),
+        ("ymaps.collect.complete", 0.5),
+        ("ymaps.send.started", 1.0),
+        ("connection.connect_tcp.started", 1.5),
+        ("connection.connect_tcp.complete", 2.0),
+        ("http11.send_request_headers.started", 2.0),
+        ("http11.send_request_headers.complete", 2.5),
+        ("http11.receive_response_headers.started", 2.5),
+        ("http11.receive_response_headers.complete", 4.0),
+        ("http11.receive_response_body.started", 4.0),
+        ("http11.receive_response_body.complete", 5.0),
+        ("ymaps.decode.started", 5.0),
+        ("ymaps.decode.complete", 5.5),
+    ]
+    trace.start, trace.end = 0.0, 6.0
+    assert trace.phases() == {
+        "collect": 0.5,
+        "pool_wait": 0.5,
+        "connect": 0.5,
+        "send": 0.5,
+        "ttfb": 1.5,
+        "body": 1.0,
+        "decode": 0.5,
+        "total": 6.0,
+    }
+    assert trace.attempts == 1
+
+
+def test_network_phases(server_url):
+    class LocalSearch(SearchClient):
+        BASE_URL = server_url
+
+    traces = []
+    client = LocalSearch("api_key", tracer=traces.append)
+    client.search("cafe")
+    client.search("bank")
+
+    first, second = traces
+    assert first.service == "search" and first.method == "search"
+    assert {"collect", "pool_wait", "connect", "send", "ttfb", "body", "decode"} <= set(
+        first.phases()
+    )
+    # the connection is reused
+    assert "connect" not in second.phases()
+    assert second.as_dict()["phases"]["total"] > 0
+
+
+def test_collect_traces():
+    server = FakeServer(api_key="api_key")
+    client = GeocodeClient("api_key", transport=server.transport())
+    client.geocode("Москва")
+
+    with collect_traces() as traces:
+        client.reverse([37.611347, 55.760241])
+        client.geocode_many(["Тверь", "Казань"], concurrency=2)
+        client.prepare()("Москва")
+        with pytest.raises(InvalidKey):
+            GeocodeClient("key", transport=server.transport()).geocode("Тверь")
+
+    assert sorted(trace.method for trace in traces) == [
+        "geocode", "geocode", "geocode", "prepared", "reverse"
+    ]
+    assert [trace.error for trace in traces if trace.error] == ["InvalidKey"]
+    assert all(trace.attempts == 1 for trace in traces)
+    assert "decode" in traces[0].phases()
+
+
+@pytest.mark.asyncio
+async def test_async_network_phases(server_url):
+    class LocalSearch(SearchAsyncClient):
+        BASE_URL = server_url
+
+    traces = []
+    client = LocalSearch("api_key", tracer=traces.append)
+    await client.search_many(["cafe", "bank"])
+
+    assert len(traces) == 2
+    assert {"pool_wait", "send", "ttfb", "body", "decode"} <= set(traces[0].phases())
+
+
+@pytest.mark.asyncio
+async def test_async_collect_traces():
+    client = GeocodeAsyncClient("api_key", transport=FakeServer().async_transport())
+
+    with collect_traces() as traces:
+        await client.reverse([37.611347, 55.760241])
+    assert [trace.method for trace in traces] == ["reverse"]
+    assert "decode" in traces[0].phases()
@@ -0,0 +1,140 @@
+"""
+Command line interface of ymaps
+
+    $ python -m ymaps geocode addresses.csv results.csv --api-key KEY --checkpoint progress.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+from typing import List, Optional, Tuple, Union
+
+from ymaps.api_parameters import ParameterCollector
+from ymaps.asynchr import GeocodeAsyncClient
+from ymaps.bulk import FORMATS, geocode_file
+from ymaps.normalize import Deduplicator
+from ymaps.ratelimit import RateLimiter
+from ymaps.retry import RetryPolicy
+from ymaps.settings import DefaultSettings
+
+
+def parse_param(param: str) -> Tuple[str, Union[str, List[str]]]:
+    """
+    Parses NAME=VALUE of --param, values of list parameters are split
+    into lists, e.g. ll=37.6,55.7 into ["37.6", "55.7"]
+    """
+    if "=" not in param:
+        raise argparse.ArgumentTypeError("expected NAME=VALUE, got {!r}".format(param))
+    name, value = param.split("=", 1)
+    if name in ParameterCollector.params_coordinates:
+        return name, re.split("[,~]", value)
+    if name in ParameterCollector.params_separate_by_comma:
+        return name, value.split(",")
+    if name in ParameterCollector.params_separate_by_tilda:
+        return name, value.split("~")
+    return name, value
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m ymaps")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    geocode = commands.add_parser(
+        "geocode", help="geocode addresses of a CSV or JSONL file"
+    )
+    geocode.add_argument("input", help="CSV file with a header or JSONL file")
+    geocode.add_argument("output", help="CSV or JSONL file of rows with results")
+    geocode.add_argument(
+        "--api-key",
+        default=os.environ.get("YMAPS_API_KEY"),
+        help="Geocoder api key, YMAPS_API_KEY by default",
+    )
+    geocode.add_argument("--column", default="address", help="column of addresses")
+    geocode.add_argument(
+        "--order",
+        choices=("input", "completion"),
+        default="input",
+        help="order of output rows",
+    )
+    geocode.add_argument(
+        "--concurrency",
+        type=int,
+        default=DefaultSettings.concurrency,
+        help="requests in flight",
+    )
+    geocode.add_argument("--rate", type=float, help="requests per second")
+    geocode.add_argument(
+        "--retries",
+        type=int,
+        default=DefaultSettings.retry_attempts,
+        help="attempts of a request",
+    )
+    geocode.add_argument("--checkpoint", help="file of progress to resume from")
+    geocode.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        default=DefaultSettings.bulk_checkpoint_interval,
+        help="rows between checkpoints",
+    )
+    geocode.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="send equal addresses once, e.g. differing in case or abbreviations",
+    )
+    geocode.add_argument("--input-format", choices=FORMATS)
+    geocode.add_argument("--output-format", choices=FORMATS)
+    geocode.add_argument("--lang", default=DefaultSettings.language)
+    geocode.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        type=parse_param,
+        metavar="NAME=VALUE",
+        help="Geocoder parameter, e.g. kind=house",
+    )
+    return parser
+
+
+async def run_geocode(args) -> dict:
+    params = dict(args.param)
+    params.setdefault("results", 1)
+    client = GeocodeAsyncClient(
+        args.api_key,
+        language=args.lang,
+        rate_limiter=RateLimiter(args.rate) if args.rate else None,
+        retry=RetryPolicy(attempts=args.retries),
+    )
+    try:
+        return await geocode_file(
+            client,
+            args.input,
+            args.output,
+            column=args.column,
+            order=args.order,
+            concurrency=args.concurrency,
+            checkpoint_path=args.checkpoint,
+            checkpoint_interval=args.checkpoint_interval,
+            input_format=args.input_format,
+            output_format=args.output_format,
+            deduplicator=Deduplicator() if args.dedupe else None,
+            **params,
+        )
+    finally:
+        await client.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = get_parser().parse_args(argv)
+    if not args.api_key:
+        print("An api key is required: --api-key or YMAPS_API_KEY", file=sys.stderr)
+        return 2
+    stats = asyncio.run(run_geocode(args))
+    print(json.dumps(stats), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
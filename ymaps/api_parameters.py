@@ -2,11 +2,20 @@
 API Parameter Collector for ymaps
 """
 
+import re
+from typing import Dict
+from urllib.parse import urlencode
+
+
+# geocode of reverse geocoding, free text of forward geocoding is not a pair
+COORDINATE_PAIR = re.compile(r"-?\d+(\.\d+)?,-?\d+(\.\d+)?")
+
 
 class ParameterCollector:
     params_separate_by_comma = ["ll", "spn", "size", "types", "ull", "reverse", "l"]
     params_separate_by_tilda = ["pt", "pl"]
     params_bool_values = ["rspn", "highlight", "strict_bounds", "print_address"]
+    params_coordinates = ["ll", "spn", "bbox", "ull"]
 
     def _collect_request_parameters(self, **params):
         correct_params = params
@@ -27,3 +36,42 @@ class ParameterCollector:
             correct_params["bbox"] = "{},{}~{},{}".format(*params["bbox"])
 
         return correct_params
+
+
+def encode_value(value):
+    """Joins coordinates given as a list or a tuple"""
+    if isinstance(value, (list, tuple)):
+        return ",".join(map(str, value))
+    return value
+
+
+def request_key(url: str, params: Dict) -> str:
+    """
+    Canonical form of request parameters with sorted keys and normalized coordinates,
+    the api key is not a part of it
+    """
+    items = sorted(
+        (key, _normalize_value(key, value))
+        for key, value in params.items()
+        if key != "apikey"
+    )
+    return "{}?{}".format(url, urlencode(items))
+
+
+def _normalize_value(key, value):
+    value = str(value)
+    if key == "geocode":
+        if not COORDINATE_PAIR.fullmatch(value):
+            return value.strip()
+    elif key not in ParameterCollector.params_coordinates:
+        return value
+    return "~".join(
+        ",".join(map(_normalize_number, part.split(","))) for part in value.split("~")
+    )
+
+
+def _normalize_number(token):
+    try:
+        return repr(float(token))
+    except ValueError:
+        return token.strip()
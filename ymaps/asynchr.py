@@ -2,12 +2,64 @@
 Asynchronous Client for Yandex Maps API
 """
 
-from httpx import AsyncClient
-from typing import Dict, List, Optional
+import asyncio
+import os
+import threading
+import weakref
+from contextlib import nullcontext
+
+from httpx import (
+    AsyncBaseTransport,
+    AsyncClient,
+    Limits,
+    QueryParams,
+    Request,
+    Response,
+)
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+)
 
 from ymaps.settings import DefaultSettings
 from ymaps.exceptions import Exceptions
-from ymaps.api_parameters import ParameterCollector
+from ymaps.api_parameters import (
+    COORDINATE_PAIR,
+    ParameterCollector,
+    encode_value,
+    request_key,
+)
+from ymaps.cache import BaseCache
+from ymaps.cassette import Cassette
+from ymaps.files import temporary_file
+from ymaps.ratelimit import RateLimiter
+from ymaps.retry import RetryPolicy
+from ymaps.metrics import MetricsRegistry
+from ymaps.normalize import Deduplicator
+from ymaps.tracing import Trace, current_trace, traced
+from ymaps.prefix_cache import PrefixCache
+from ymaps.spatial_cache import ReverseCache
+from ymaps.pagination import check_page, geocode_page, has_next_page, search_page
+
+
+class SharedAsyncTransport(AsyncBaseTransport):
+    """
+    Transport shared by several clients, closing a client does not close it
+    """
+
+    def __init__(self, transport: AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: Request) -> Response:
+        return await self.transport.handle_async_request(request)
 
 
 class BaseAsyncClient:
@@ -18,26 +70,250 @@ class BaseAsyncClient:
         https://yandex.ru/dev/maps/mapsapi/
     """
 
+    SERVICE = "base"
+    PREPARED_ARGUMENT = "text"
+
     def __init__(
         self,
         base_url: str,
         api_key: Optional[str] = None,
         language: Optional[str] = DefaultSettings.language,
         timeout: Optional[int] = DefaultSettings.timeout,
+        cache: Optional[BaseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        transport: Optional[AsyncBaseTransport] = None,
+        limits: Limits = DefaultSettings.limits,
+        http2: bool = False,
+        json_loads: Callable[[bytes], Any] = DefaultSettings.json_loads,
+        coalesce: bool = False,
+        metrics: Optional[MetricsRegistry] = None,
+        tracer: Optional[Callable[[Trace], None]] = None,
+        cassette: Optional[Cassette] = None,
     ):
+        self._cache = cache
+        self._metrics = metrics
+        self._tracer = tracer
+        self._rate_limiter = rate_limiter
+        self._retry = retry
+        self._api_key = api_key
+        self._json_loads = json_loads
+        self._coalesce = coalesce
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
         client_settings = {"lang": language}
         if api_key:
             client_settings["apikey"] = api_key
 
+        client_transport: Optional[AsyncBaseTransport] = None
+        if cassette is not None:
+            client_transport = cassette.async_transport(transport, limits, http2)
+        elif transport is not None:
+            client_transport = SharedAsyncTransport(transport)
+
         self._client = AsyncClient(
             base_url=base_url,
             params=client_settings,
             timeout=timeout,
+            transport=client_transport,
+            limits=limits,
+            http2=http2,
+        )
+        # the url of _get without the query, which prepared requests are joined to
+        self._url = str(self._client.build_request("GET", ".").url.copy_with(query=None))
+
+    async def _get(self, request_parameters, query=None, method=None):
+        trace = current_trace()
+        if trace is not None:
+            trace.mark("ymaps.collect.complete")
+        if self._metrics is None:
+            response = await self._request(request_parameters, query)
+            return Exceptions(response).get_exception_or_response()
+
+        with self._metrics.observe(self.SERVICE, method or self.SERVICE) as observation:
+            observation.response = await self._request(
+                request_parameters, query, observation
+            )
+            return Exceptions(observation.response).get_exception_or_response()
+
+    async def _request(self, request_parameters, query=None, observation=None):
+        key = None
+        if self._cache is not None or self._coalesce:
+            key = self._request_key(request_parameters)
+        if not self._coalesce:
+            return await self._fetch(request_parameters, key, query, observation)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._fetch(request_parameters, key, query, observation)
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda task: self._forget_in_flight(key, task))
+        # cancellation of one waiter does not cancel the shared request
+        return await asyncio.shield(task)
+
+    async def _fetch(self, request_parameters, key, query=None, observation=None):
+        response = None
+        if self._cache is not None:
+            response = await self._call_cache(self._cache.get, key)
+            if response is not None and observation is not None:
+                observation.cache_hit = True
+        if response is None:
+            response = await self._send(request_parameters, query)
+            if self._cache is not None:
+                await self._call_cache(self._cache.set, key, response, self.SERVICE)
+        return response
+
+    async def _send(self, request_parameters, query=None, stream=False):
+        """
+        Sends a request with rate limiting and retries. With stream=True the
+        body of the returned response is not read and it must be closed
+        """
+        if self._retry is not None:
+            self._retry.budget.deposit()
+
+        trace = current_trace()
+        extensions = None if trace is None else {"trace": trace.event_async}
+        attempt = 0
+        while True:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire_async(self.SERVICE, self._api_key)
+            if trace is not None:
+                trace.mark("ymaps.send.started")
+            response = None
+            try:
+                if query is None:
+                    request = self._client.build_request(
+                        "GET", ".", params=request_parameters, extensions=extensions
+                    )
+                else:
+                    request = self._build_request(query, extensions)
+                response = await self._client.send(request, stream=stream)
+            except Exception as exception:
+                if self._retry is None or not self._retry.should_retry(
+                    attempt, exception=exception
+                ):
+                    raise
+            else:
+                if self._retry is None or not self._retry.should_retry(
+                    attempt, response=response
+                ):
+                    return response
+                await response.aclose()
+            await asyncio.sleep(self._retry.get_delay(attempt, response))
+            attempt += 1
+
+    def _forget_in_flight(self, key, task):
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            # the exception is retrieved even if every waiter was cancelled
+            task.exception()
+
+    def _build_request(self, query: str, extensions: Optional[Dict] = None) -> Request:
+        """Builds a request with an encoded query, client parameters are not merged again"""
+        return Request(
+            "GET",
+            "{}?{}".format(self._url, query),
+            headers=self._client.headers,
+            extensions={"timeout": self._client.timeout.as_dict(), **(extensions or {})},
         )
 
-    async def _get(self, request_parameters):
-        response = await self._client.get(".", params=request_parameters)
-        return Exceptions(response).get_exception_or_response()
+    def _process(self, result: Any) -> Any:
+        """Converts the result of _get as the service method does"""
+        return self._decode(result)
+
+    def _decode(self, response: Response) -> Any:
+        """Decodes a JSON response body without decoding it to text first"""
+        trace = current_trace()
+        if trace is None:
+            return self._json_loads(response.content)
+        trace.mark("ymaps.decode.started")
+        result = self._json_loads(response.content)
+        trace.mark("ymaps.decode.complete")
+        return result
+
+    def _request_key(self, request_parameters) -> str:
+        params = {**self._client.params, **request_parameters}
+        return request_key(str(self._client.base_url), params)
+
+    async def _call_cache(self, method, *args):
+        if not self._cache.blocking:
+            return method(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+    async def _gather(
+        self, method, queries, concurrency, deduplicator=None, **params
+    ) -> List:
+        """
+        Calls method for every query with at most `concurrency` requests in flight.
+        Results are returned in input order, errors are returned in place of results.
+        With a deduplicator, equal queries are sent once and share the result
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        if deduplicator is not None:
+            queries, positions = deduplicator.group(queries)
+            unique_results = await self._gather(method, queries, concurrency, **params)
+            return [unique_results[position] for position in positions]
+
+        results: Dict = {}
+        enumerated_queries = enumerate(queries)
+
+        async def worker():
+            for index, query in enumerated_queries:
+                try:
+                    results[index] = await method(query, **params)
+                except Exception as exception:
+                    results[index] = exception
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return [results[index] for index in range(len(results))]
+
+    async def _iter_pages(self, method, get_page, query, results, skip=0, **params):
+        """
+        Yields items of consecutive pages, the next page is requested
+        in the background while the current one is consumed
+        """
+        check_page(results, skip)
+        next_page = asyncio.ensure_future(
+            method(query, results=results, skip=skip, **params)
+        )
+        try:
+            while next_page is not None:
+                page = get_page(await next_page)
+                skip += results
+                next_page = None
+                if has_next_page(page, results, skip):
+                    next_page = asyncio.ensure_future(
+                        method(query, results=results, skip=skip, **params)
+                    )
+                for item in page[0]:
+                    yield item
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    @traced("prepared")
+    async def _call_prepared(self, request_parameters, query):
+        return await self._get_prepared(request_parameters, query)
+
+    async def _get_prepared(self, request_parameters, query):
+        """Sends a prepared request as the service method does, including its caches"""
+        result = await self._get(request_parameters, query, method="prepared")
+        return self._process(result)
+
+    def prepare(self, **fixed_params) -> "AsyncPreparedRequest":
+        """
+        Returns a callable sending requests with fixed parameters, which are
+        collected and encoded once. The callable takes the value of the
+        argument that varies, e.g. text for search or geocode for geocode
+
+            >>> search = client.prepare(ll=[37.61, 55.75], spn=[0.5, 0.5], results=5)
+            >>> await search('кафе')
+        """
+        fixed_parameters = self._collect_request_parameters(**fixed_params)  # type: ignore
+        return AsyncPreparedRequest(self, fixed_parameters)
 
     async def close(self):
         await self._client.aclose()
@@ -49,6 +325,24 @@ class BaseAsyncClient:
         await self.close()
 
 
+class AsyncPreparedRequest:
+    """
+    Request with fixed parameters, see BaseAsyncClient.prepare
+    """
+
+    def __init__(self, client: BaseAsyncClient, fixed_parameters: Dict):
+        self.client = client
+        self.argument = client.PREPARED_ARGUMENT
+        self.parameters = fixed_parameters
+        self.query = str(QueryParams({**client._client.params, **fixed_parameters}))
+
+    async def __call__(self, value) -> Any:
+        value = encode_value(value)
+        request_parameters = {**self.parameters, self.argument: value}
+        query = "{}&{}".format(self.query, QueryParams({self.argument: value}))
+        return await self.client._call_prepared(request_parameters, query)
+
+
 class SearchAsyncClient(BaseAsyncClient, ParameterCollector):
     """
     Async Yandex Place API client
@@ -58,20 +352,39 @@ class SearchAsyncClient(BaseAsyncClient, ParameterCollector):
     """
 
     BASE_URL = "https://search-maps.yandex.ru/v1"
+    SERVICE = "search"
 
     def __init__(
         self,
         api_key: str,
         language: Optional[str] = DefaultSettings.language,
         timeout: Optional[int] = DefaultSettings.timeout,
+        **options,
     ):
-        super().__init__(self.BASE_URL, api_key, language, timeout)
+        super().__init__(self.BASE_URL, api_key, language, timeout, **options)
 
+    @traced("search")
     async def search(self, text: str, **params) -> Dict:
         """Search for a geographical object or organization"""
         request_parameters = super()._collect_request_parameters(text=text, **params)
         response = await self._get(request_parameters)
-        return response.json()
+        return self._decode(response)
+
+    async def search_many(
+        self,
+        texts: Iterable[str],
+        concurrency: int = DefaultSettings.concurrency,
+        deduplicator: Optional[Deduplicator] = None,
+        **params,
+    ) -> List:
+        """Search for several texts concurrently"""
+        return await self._gather(self.search, texts, concurrency, deduplicator, **params)
+
+    def iter_search(
+        self, text: str, results: int = DefaultSettings.page_size, **params
+    ) -> AsyncIterator[Dict]:
+        """Yields features of all result pages"""
+        return self._iter_pages(self.search, search_page, text, results, **params)
 
 
 class GeocodeAsyncClient(BaseAsyncClient, ParameterCollector):
@@ -83,15 +396,21 @@ class GeocodeAsyncClient(BaseAsyncClient, ParameterCollector):
     """
 
     BASE_URL = "https://geocode-maps.yandex.ru/1.x"
+    SERVICE = "geocode"
+    PREPARED_ARGUMENT = "geocode"
 
     def __init__(
         self,
         api_key: str,
         language: Optional[str] = DefaultSettings.language,
         timeout: Optional[int] = DefaultSettings.timeout,
+        reverse_cache: Optional[ReverseCache] = None,
+        **options,
     ) -> None:
-        super().__init__(self.BASE_URL, api_key, language, timeout)
+        self._reverse_cache = reverse_cache
+        super().__init__(self.BASE_URL, api_key, language, timeout, **options)
 
+    @traced("geocode")
     async def geocode(self, geocode: str, **params) -> Dict:
         """Search for geographical coordinates of objects"""
         request_parameters = await self._collect_request_parameters(
@@ -99,17 +418,63 @@ class GeocodeAsyncClient(BaseAsyncClient, ParameterCollector):
         )
         return await self._get(request_parameters)
 
+    @traced("reverse")
     async def reverse(self, geocode: List, **params) -> Dict:
         """Search for objects by geographical coordinates"""
         request_parameters = await self._collect_reverse_parameters(geocode, **params)
-        return await self._get(request_parameters)
+        return await self._get_reverse(request_parameters)
 
-    async def _get(self, request_parameters):
-        result = await super()._get(request_parameters)
+    async def geocode_many(
+        self,
+        geocodes: Iterable[str],
+        concurrency: int = DefaultSettings.concurrency,
+        deduplicator: Optional[Deduplicator] = None,
+        **params,
+    ) -> List:
+        """Geocode several addresses concurrently"""
+        return await self._gather(self.geocode, geocodes, concurrency, deduplicator, **params)
+
+    async def reverse_many(
+        self,
+        geocodes: Iterable[List],
+        concurrency: int = DefaultSettings.concurrency,
+        deduplicator: Optional[Deduplicator] = None,
+        **params,
+    ) -> List:
+        """Reverse geocode several coordinates concurrently"""
+        return await self._gather(self.reverse, geocodes, concurrency, deduplicator, **params)
+
+    def iter_geocode(
+        self, geocode: str, results: int = DefaultSettings.page_size, **params
+    ) -> AsyncIterator[Dict]:
+        """Yields featureMember items of all result pages"""
+        return self._iter_pages(self.geocode, geocode_page, geocode, results, **params)
+
+    def _process(self, result):
+        return result
+
+    async def _get_reverse(self, request_parameters, query=None, method="reverse"):
+        if self._reverse_cache is None:
+            return await self._get(request_parameters, query, method)
+
+        cache_parameters = {**self._client.params, **request_parameters}
+        result = self._reverse_cache.get(cache_parameters)
+        if result is None:
+            result = await self._get(request_parameters, query, method)
+            self._reverse_cache.set(cache_parameters, result)
+        return result
+
+    async def _get_prepared(self, request_parameters, query):
+        if COORDINATE_PAIR.fullmatch(str(request_parameters["geocode"])):
+            return await self._get_reverse(request_parameters, query, "prepared")
+        return await super()._get_prepared(request_parameters, query)
+
+    async def _get(self, request_parameters, query=None, method=None):
+        result = await super()._get(request_parameters, query, method)
         if request_parameters["format"] == "json" and not request_parameters.get(
             "callback"
         ):
-            return result.json()
+            return self._decode(result)
         return result.text
 
     async def _collect_reverse_parameters(self, geocode, **params):
@@ -119,6 +484,13 @@ class GeocodeAsyncClient(BaseAsyncClient, ParameterCollector):
         request_parameters["geocode"] = request_parameters.pop("reverse")
         return request_parameters
 
+    def prepare(self, **fixed_params) -> AsyncPreparedRequest:
+        fixed_params["format"] = fixed_params.get("format", "json")
+        fixed_parameters = ParameterCollector._collect_request_parameters(
+            self, **fixed_params
+        )
+        return AsyncPreparedRequest(self, fixed_parameters)
+
     async def _collect_request_parameters(self, **params):
         params["format"] = params.get("format", "json")
         return super()._collect_request_parameters(**params)
@@ -133,20 +505,57 @@ class SuggestAsyncClient(BaseAsyncClient, ParameterCollector):
     """
 
     BASE_URL = "https://suggest-maps.yandex.ru/v1/suggest"
+    SERVICE = "suggest"
 
     def __init__(
         self,
         api_key: str,
         language: Optional[str] = DefaultSettings.suggest_language,
         timeout: Optional[int] = DefaultSettings.timeout,
+        prefix_cache: Optional[PrefixCache] = None,
+        **options,
     ):
-        super().__init__(self.BASE_URL, api_key, language, timeout)
+        self._prefix_cache = prefix_cache
+        super().__init__(self.BASE_URL, api_key, language, timeout, **options)
 
+    @traced("suggest")
     async def suggest(self, text: str, **params) -> Dict:
         """Get suggestions based on search results"""
         request_parameters = self._collect_request_parameters(text=text, **params)
-        response = await self._get(request_parameters)
-        return response.json()
+        return await self._get_suggestions(request_parameters)
+
+    async def suggest_many(
+        self,
+        texts: Iterable[str],
+        concurrency: int = DefaultSettings.concurrency,
+        deduplicator: Optional[Deduplicator] = None,
+        **params,
+    ) -> List:
+        """Get suggestions for several texts concurrently"""
+        return await self._gather(self.suggest, texts, concurrency, deduplicator, **params)
+
+    async def _get_suggestions(self, request_parameters, query=None, method=None):
+        if self._prefix_cache is None:
+            return self._decode(await self._get(request_parameters, query, method))
+
+        cache_parameters = {**self._client.params, **request_parameters}
+        result = self._prefix_cache.get(cache_parameters)
+        if result is None:
+            result = self._decode(await self._get(request_parameters, query, method))
+            self._prefix_cache.set(cache_parameters, result)
+        return result
+
+    async def _get_prepared(self, request_parameters, query):
+        return await self._get_suggestions(request_parameters, query, "prepared")
+
+    def typeahead(
+        self,
+        debounce: float = DefaultSettings.suggest_debounce,
+        on_result: Optional[Callable[[str, Dict], Any]] = None,
+        **params,
+    ) -> "TypeaheadSession":
+        """Creates a session getting suggestions for text typed by a user"""
+        return TypeaheadSession(self, debounce, on_result, **params)
 
 
 class StaticAsyncClient(BaseAsyncClient, ParameterCollector):
@@ -158,6 +567,8 @@ class StaticAsyncClient(BaseAsyncClient, ParameterCollector):
     """
 
     BASE_URL = "https://static-maps.yandex.ru/v1"
+    SERVICE = "static"
+    PREPARED_ARGUMENT = "ll"
 
     def __init__(
         self,
@@ -165,18 +576,68 @@ class StaticAsyncClient(BaseAsyncClient, ParameterCollector):
         language: Optional[str] = DefaultSettings.language,
         timeout: Optional[int] = DefaultSettings.timeout,
         url: str = DefaultSettings.static_url,
+        **options,
     ):
         if url == "1.x":
             self.BASE_URL = self.BASE_URL.replace(DefaultSettings.static_url, "1.x//")
 
-        super().__init__(self.BASE_URL, api_key, language, timeout)
+        super().__init__(self.BASE_URL, api_key, language, timeout, **options)
 
-    async def load_image(self, path, **params):
-        content = await self.get_image(**params)
-        with open(path, "wb") as file:
-            file.write(content)
-        return content
+    def _process(self, result):
+        return result.content
 
+    @traced("load_image")
+    async def load_image(self, path: str, **params) -> str:
+        """
+        Streams an image according to the given parameters to the file at path.
+        The image is written to a temporary file, which replaces path when complete.
+        Requests are rate limited and retried as in get_image, an image cached by
+        get_image is written without a request, streamed images are not cached.
+        File operations run in the default executor and do not block the event loop
+        """
+        request_parameters = self._collect_request_parameters(**params)
+        observe = (
+            self._metrics.observe(self.SERVICE, "load_image")
+            if self._metrics is not None
+            else nullcontext()
+        )
+        with observe as observation:
+            return await self._load_image(path, request_parameters, observation)
+
+    async def _load_image(self, path, request_parameters, observation) -> str:
+        loop = asyncio.get_running_loop()
+        cached: Optional[Response] = None
+        if self._cache is not None:
+            key = self._request_key(request_parameters)
+            cached = await self._call_cache(self._cache.get, key)
+        if cached is None:
+            response = await self._send(request_parameters, stream=True)
+        else:
+            response = cached
+        try:
+            if observation is not None:
+                observation.response = response
+                observation.cache_hit = cached is not None
+            if response.status_code != 200:
+                await response.aread()
+            Exceptions(response).get_exception_or_response()
+
+            file = await loop.run_in_executor(None, temporary_file, path)
+            try:
+                async for chunk in response.aiter_bytes(DefaultSettings.chunk_size):
+                    await loop.run_in_executor(None, file.write, chunk)
+                await loop.run_in_executor(None, file.close)
+                await loop.run_in_executor(None, os.replace, file.name, path)
+            except BaseException:
+                file.close()
+                os.unlink(file.name)
+                raise
+        finally:
+            if cached is None:
+                await response.aclose()
+        return path
+
+    @traced("get_image")
     async def get_image(self, **params) -> bytes:
         """
         Returns an image according to the given parameters
@@ -187,5 +648,173 @@ class StaticAsyncClient(BaseAsyncClient, ParameterCollector):
 
         """
         params = self._collect_request_parameters(**params)
-        response = await self._get(params)
+        response = await self._get(params, method="get_image")
         return response.content
+
+
+class TypeaheadSession:
+    """
+    Suggestions for text typed by a user
+
+    A request is sent after `debounce` seconds without updates, every update
+    cancels the pending or in-flight request for the previous text, so only
+    the result for the latest text is delivered to on_result
+
+        >>> session = SuggestAsyncClient('api_key').typeahead(on_result=show)
+        >>> session.update('санкт')
+        >>> session.update('санкт-п')
+        >>> await session.result()
+    """
+
+    def __init__(
+        self,
+        client: SuggestAsyncClient,
+        debounce: float = DefaultSettings.suggest_debounce,
+        on_result: Optional[Callable[[str, Dict], Any]] = None,
+        **params,
+    ):
+        self.client = client
+        self.debounce = debounce
+        self.on_result = on_result
+        self.params = params
+        self._task: Optional[asyncio.Task] = None
+
+    def update(self, text: str) -> asyncio.Task:
+        """Sets the latest text, the task returns suggestions for it"""
+        if self._task is not None:
+            self._discard(self._task)
+        self._task = asyncio.ensure_future(self._suggest(text))
+        return self._task
+
+    async def result(self) -> Dict:
+        """Waits for suggestions for the latest text"""
+        while True:
+            task = self._task
+            if task is None:
+                raise RuntimeError("No text was typed")
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # the task was replaced by an update, wait for the new one
+                if task is self._task or not task.cancelled():
+                    raise
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._discard(self._task)
+
+    @staticmethod
+    def _discard(task):
+        task.cancel()
+        if task.done() and not task.cancelled():
+            # nobody waits for a replaced task, its error must not be reported
+            task.exception()
+
+    async def _suggest(self, text):
+        await asyncio.sleep(self.debounce)
+        result = await self.client.suggest(text, **self.params)
+        if self.on_result is not None:
+            self.on_result(text, result)
+        return result
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, tb):
+        self.cancel()
+
+
+ClientType = TypeVar("ClientType", bound=BaseAsyncClient)
+
+
+class AsyncClientRegistry(Generic[ClientType]):
+    """
+    Hands out one client per running event loop
+
+    Clients are created on the first call in a loop and closed when the loop
+    shuts down its asynchronous generators, as asyncio.run does. A client of
+    a loop closed without that is closed when the loop is collected or on the
+    next get() call
+
+        >>> geocode = AsyncClientRegistry(GeocodeAsyncClient, 'api_key')
+        >>> client = await geocode.get()
+    """
+
+    def __init__(self, client_class: Type[ClientType], *args, **kwargs):
+        self.client_class = client_class
+        self.args = args
+        self.kwargs = kwargs
+        # entries don't reference their loop, so that it can be collected
+        self._clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    async def get(self) -> ClientType:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._clients.get(loop)
+            if entry is not None:
+                return entry[0]
+
+            abandoned = [
+                self._clients.pop(other) for other in list(self._clients) if other.is_closed()
+            ]
+            client = self.client_class(*self.args, **self.kwargs)
+            closer = self._close_on_shutdown(weakref.ref(loop), client)
+            finalizer = weakref.finalize(loop, _close_abandoned, client)
+            # the closer references its loop, so only the loop holds it strongly:
+            # the timer never fires and is dropped by loop.close
+            loop.call_later(_KEEP_ALIVE, _keep_alive, closer)
+            self._clients[loop] = (client, weakref.ref(closer), finalizer)
+
+        for _, _, other_finalizer in abandoned:
+            other_finalizer()
+        # the loop keeps track of the generator and finalizes it on shutdown
+        await closer.__anext__()
+        return client
+
+    async def aclose(self) -> None:
+        """Closes the client of the running loop"""
+        with self._lock:
+            entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            entry[2].detach()
+            closer = entry[1]()
+            if closer is not None:
+                await closer.aclose()
+            else:
+                await entry[0].close()
+
+    async def _close_on_shutdown(self, loop_ref, client):
+        try:
+            yield
+        finally:
+            loop = loop_ref()
+            with self._lock:
+                entry = None if loop is None else self._clients.get(loop)
+                if entry is not None and entry[0] is client:
+                    del self._clients[loop]
+                    entry[2].detach()
+            await client.close()
+
+
+# about 30 years, finite for loops which don't accept infinite delays
+_KEEP_ALIVE = 1e9
+
+
+def _keep_alive(closer) -> None:
+    pass
+
+
+def _close_abandoned(client: BaseAsyncClient) -> None:
+    """
+    Closes a client of a closed or collected loop without awaiting in it,
+    connections which need the loop to be closed are left to the garbage collector
+    """
+    coroutine = client.close()
+    try:
+        coroutine.send(None)
+    except Exception:
+        # StopIteration when the client is closed
+        pass
+    finally:
+        coroutine.close()
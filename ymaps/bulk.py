@@ -0,0 +1,263 @@
+"""
+Bulk geocoding of address files for ymaps
+"""
+
+import asyncio
+import csv
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+from ymaps.asynchr import GeocodeAsyncClient
+from ymaps.exceptions import InvalidKey
+from ymaps.models import GeoObject
+from ymaps.normalize import Deduplicator
+from ymaps.settings import DefaultSettings
+
+
+RESULT_FIELDS = ["lon", "lat", "formatted", "kind", "precision", "error"]
+FORMATS = ("csv", "jsonl")
+
+
+def get_format(path: str, file_format: Optional[str] = None) -> str:
+    if file_format is None:
+        file_format = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+    if file_format not in FORMATS:
+        raise ValueError("format must be one of {}".format(", ".join(FORMATS)))
+    return file_format
+
+
+def read_rows(path: str, file_format: str) -> Iterator[Dict]:
+    """Yields rows of a CSV file with a header or objects of a JSONL file"""
+    with open(path, newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def get_result(response: Optional[Dict], error: Optional[Exception]) -> Dict:
+    """Fields of the first found object or the error"""
+    result = dict.fromkeys(RESULT_FIELDS)
+    if error is not None:
+        result["error"] = "{}: {}".format(type(error).__name__, error)
+        return result
+    objects = GeoObject.from_response(response) if response else []
+    if not objects:
+        result["error"] = "Not found"
+        return result
+    result["lon"], result["lat"] = objects[0].point
+    result["formatted"] = objects[0].formatted
+    result["kind"] = objects[0].kind
+    result["precision"] = objects[0].precision
+    return result
+
+
+class Checkpoint:
+    """
+    Progress of a bulk run: rows before `rows` and rows in `done` are written,
+    the output is valid up to `offset` bytes. The file is replaced atomically
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self.done: Set[int] = set()
+        self.offset = 0
+        if os.path.exists(path):
+            with open(path) as file:
+                state = json.load(file)
+            self.rows = state["rows"]
+            self.done = set(state["done"])
+            self.offset = state["offset"]
+
+    def is_written(self, index: int) -> bool:
+        return index < self.rows or index in self.done
+
+    def add(self, index: int) -> None:
+        self.done.add(index)
+        while self.rows in self.done:
+            self.done.remove(self.rows)
+            self.rows += 1
+
+    def save(self, offset: int) -> None:
+        self.offset = offset
+        state = {"rows": self.rows, "done": sorted(self.done), "offset": offset}
+        file = tempfile.NamedTemporaryFile(
+            "w", dir=os.path.dirname(os.path.abspath(self.path)), delete=False
+        )
+        with file:
+            json.dump(state, file)
+        os.replace(file.name, self.path)
+
+
+class Writer:
+    """Appends result rows to a CSV or JSONL file"""
+
+    def __init__(self, path: str, file_format: str, offset: Optional[int] = None):
+        self.file_format = file_format
+        # a resumed output is cut to the checkpoint, rows written after it are repeated
+        self.file = open(path, "w" if offset is None else "a", newline="", encoding="utf-8")
+        if offset is not None:
+            self.file.truncate(offset)
+        self._csv: Optional[csv.DictWriter] = None
+
+    def write(self, index: int, row: Dict, result: Dict) -> None:
+        record = {"row": index, **row, **result}
+        if self.file_format == "jsonl":
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+        if self._csv is None:
+            self._csv = csv.DictWriter(self.file, list(record), extrasaction="ignore")
+            if self.offset() == 0:
+                self._csv.writeheader()
+        self._csv.writerow(record)
+
+    def offset(self) -> int:
+        self.file.flush()
+        return os.fstat(self.file.fileno()).st_size
+
+    def close(self) -> None:
+        self.file.close()
+
+
+async def geocode_file(
+    client: GeocodeAsyncClient,
+    input_path: str,
+    output_path: str,
+    column: str = "address",
+    order: str = "input",
+    concurrency: int = DefaultSettings.concurrency,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_interval: int = DefaultSettings.bulk_checkpoint_interval,
+    input_format: Optional[str] = None,
+    output_format: Optional[str] = None,
+    deduplicator: Optional[Deduplicator] = None,
+    **params,
+) -> Dict:
+    """
+    Geocodes the `column` of every input row and writes rows with results
+    in input or completion order. The input is streamed, at most
+    `concurrency` requests are in flight and a bounded number of rows wait
+    to be written. With checkpoint_path a restarted run continues where
+    the previous one stopped. With a deduplicator, addresses equal to one
+    of the last dedup_max_entries addresses reuse its result. Returns counts
+    of rows
+    """
+    if order not in ("input", "completion"):
+        raise ValueError("order must be input or completion")
+    input_format = get_format(input_path, input_format)
+    output_format = get_format(output_path, output_format)
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+    offset = None
+    if checkpoint is not None and os.path.exists(checkpoint.path):
+        if not os.path.exists(output_path):
+            raise ValueError("The output of the checkpoint does not exist")
+        offset = checkpoint.offset
+    writer = Writer(output_path, output_format, offset)
+
+    stats = {"rows": 0, "skipped": 0, "geocoded": 0, "errors": 0}
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    window = asyncio.Semaphore(concurrency * DefaultSettings.bulk_window_factor)
+    pending: Dict[int, Tuple[Dict, Dict]] = {}
+    next_index = checkpoint.rows if checkpoint else 0
+    written = 0
+    results: "OrderedDict[Hashable, asyncio.Future]" = OrderedDict()
+
+    def write(index, row, result):
+        nonlocal written
+        writer.write(index, row, result)
+        window.release()
+        written += 1
+        if checkpoint is not None:
+            checkpoint.add(index)
+            if written % checkpoint_interval == 0:
+                checkpoint.save(writer.offset())
+
+    def complete(index, row, result):
+        nonlocal next_index
+        stats["errors" if result["error"] else "geocoded"] += 1
+        if order == "completion":
+            write(index, row, result)
+            return
+        pending[index] = row, result
+        while next_index in pending or (checkpoint and checkpoint.is_written(next_index)):
+            if next_index in pending:
+                write(next_index, *pending.pop(next_index))
+            next_index += 1
+
+    async def produce():
+        for index, row in enumerate(read_rows(input_path, input_format)):
+            stats["rows"] += 1
+            if checkpoint is not None and checkpoint.is_written(index):
+                stats["skipped"] += 1
+                continue
+            await window.acquire()
+            await queue.put((index, row))
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def geocode(query):
+        response, error = None, None
+        if not query:
+            error = ValueError("Empty {}".format(column))
+        else:
+            try:
+                response = await client.geocode(query, **params)
+            except InvalidKey:
+                raise
+            except Exception as exception:
+                error = exception
+        return get_result(response, error)
+
+    async def geocode_once(query):
+        key = deduplicator.key(query)
+        if key in results:
+            results.move_to_end(key)
+            deduplicator.count(1, 0)
+            return dict(await asyncio.shield(results[key]))
+        deduplicator.count(1, 1)
+        future = results[key] = asyncio.get_running_loop().create_future()
+        if len(results) > DefaultSettings.dedup_max_entries:
+            results.popitem(last=False)
+        try:
+            result = await geocode(query)
+        except BaseException as exception:
+            results.pop(key, None)
+            future.set_exception(exception)
+            # retrieved here so that a future nobody waits for is not reported
+            future.exception()
+            raise
+        future.set_result(result)
+        return dict(result)
+
+    async def work():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, row = item
+            query = str(row.get(column) or "").strip()
+            if deduplicator is not None and query:
+                result = await geocode_once(query)
+            else:
+                result = await geocode(query)
+            complete(index, row, result)
+
+    tasks: List[asyncio.Future] = [asyncio.ensure_future(produce())]
+    tasks += [asyncio.ensure_future(work()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if checkpoint is not None:
+            checkpoint.save(writer.offset())
+        writer.close()
+    if deduplicator is not None:
+        stats["deduplicated"] = deduplicator.stats["saved"]
+    return stats
@@ -0,0 +1,297 @@
+"""
+Response caches for ymaps
+"""
+
+import abc
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from httpx import Response
+
+from ymaps.settings import DefaultSettings
+
+
+class BaseCache(abc.ABC):
+    """
+    Base class for response caches
+
+    Entries expire after ttl seconds, service_ttl overrides it for a service
+    ("search", "geocode", "suggest", "static"). Responses with errors are
+    cached only with cache_errors=True, and only for invalid parameters (400)
+    """
+
+    # the cache does I/O, async clients call it in an executor
+    blocking = False
+
+    def __init__(
+        self,
+        ttl: float = DefaultSettings.cache_ttl,
+        service_ttl: Optional[Dict[str, float]] = None,
+        cache_errors: bool = False,
+    ):
+        self.ttl = ttl
+        self.service_ttl = service_ttl or {}
+        self.cache_errors = cache_errors
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Response]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set(self, key: str, response: Response, service: str) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def is_cacheable(self, response: Response) -> bool:
+        if response.status_code == 200:
+            return True
+        return self.cache_errors and response.status_code == 400
+
+    def get_ttl(self, service: str) -> float:
+        return self.service_ttl.get(service, self.ttl)
+
+    @property
+    def stats(self) -> Dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class MemoryCache(BaseCache):
+    """
+    In-memory LRU cache of API responses bounded by max_entries and max_bytes
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DefaultSettings.cache_max_entries,
+        max_bytes: int = DefaultSettings.cache_max_bytes,
+        ttl: float = DefaultSettings.cache_ttl,
+        service_ttl: Optional[Dict[str, float]] = None,
+        cache_errors: bool = False,
+    ):
+        super().__init__(ttl, service_ttl, cache_errors)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.size = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: str) -> Optional[Response]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires, size, response = entry
+            if expires <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def set(self, key: str, response: Response, service: str) -> None:
+        if not self.is_cacheable(response):
+            return
+
+        size = len(response.content)
+        if size > self.max_bytes:
+            return
+
+        expires = time.monotonic() + self.get_ttl(service)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires, size, response)
+            self.size += size
+
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    @property
+    def stats(self) -> Dict:
+        return {**super().stats, "entries": len(self._entries), "bytes": self.size}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+
+class SQLiteCache(BaseCache):
+    """
+    Persistent cache of API responses in a SQLite file
+
+    The database is opened in WAL mode, so many processes can read and write
+    one file concurrently. Expired entries are removed by a background thread
+    every vacuum_interval seconds. Every thread uses its own connection,
+    connections of finished threads are closed when a new one is opened
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = DefaultSettings.cache_ttl,
+        service_ttl: Optional[Dict[str, float]] = None,
+        cache_errors: bool = False,
+        vacuum_interval: Optional[float] = DefaultSettings.cache_vacuum_interval,
+    ):
+        super().__init__(ttl, service_ttl, cache_errors)
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        self._closed = threading.Event()
+
+        with self._connection as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, service TEXT, expires REAL, "
+                "status INTEGER, content_type TEXT, content BLOB)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)"
+            )
+
+        if vacuum_interval:
+            threading.Thread(
+                target=self._vacuum_periodically, args=(vacuum_interval,), daemon=True
+            ).start()
+
+    def get(self, key: str) -> Optional[Response]:
+        row = self._connection.execute(
+            "SELECT status, content_type, content FROM responses "
+            "WHERE key = ? AND expires > ?",
+            (key, time.time()),
+        ).fetchone()
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        status, content_type, content = row
+        headers = {"content-type": content_type} if content_type else {}
+        return Response(status, headers=headers, content=content)
+
+    def set(self, key: str, response: Response, service: str) -> None:
+        if not self.is_cacheable(response):
+            return
+
+        with self._connection as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    service,
+                    time.time() + self.get_ttl(service),
+                    response.status_code,
+                    response.headers.get("content-type"),
+                    response.content,
+                ),
+            )
+
+    def clear(self) -> None:
+        with self._connection as connection:
+            connection.execute("DELETE FROM responses")
+
+    def vacuum(self) -> None:
+        """Removes expired entries and returns free pages to the file system"""
+        with self._connection as connection:
+            connection.execute(
+                "DELETE FROM responses WHERE expires <= ?", (time.time(),)
+            )
+        self._connection.execute("PRAGMA incremental_vacuum")
+
+    def export(self, path: str) -> None:
+        """Copies the cache to a new database file, e.g. to ship a pre-warmed cache"""
+        target = sqlite3.connect(path)
+        try:
+            self._connection.backup(target)
+            with target:
+                target.execute(
+                    "DELETE FROM responses WHERE expires <= ?", (time.time(),)
+                )
+        finally:
+            target.close()
+
+    def import_from(self, path: str) -> None:
+        """Copies not expired entries from an exported database file"""
+        connection = self._connection
+        connection.execute("ATTACH DATABASE ? AS source", (path,))
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "SELECT * FROM source.responses WHERE expires > ?",
+                    (time.time(),),
+                )
+        finally:
+            connection.execute("DETACH DATABASE source")
+
+    def close(self) -> None:
+        """Stops the vacuum thread and closes connections of all threads"""
+        self._closed.set()
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for _, connection in connections:
+            connection.close()
+
+    @property
+    def stats(self) -> Dict:
+        (entries,) = self._connection.execute(
+            "SELECT COUNT(*) FROM responses"
+        ).fetchone()
+        return {**super().stats, "entries": entries}
+
+    def __len__(self):
+        return self.stats["entries"]
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # a connection is used by its thread only, but closed by any thread
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                connections = self._connections
+                self._connections = [(threading.current_thread(), connection)]
+                for thread, other in connections:
+                    if thread.is_alive():
+                        self._connections.append((thread, other))
+                    else:
+                        other.close()
+        return connection
+
+    def _vacuum_periodically(self, interval):
+        while not self._closed.wait(interval):
+            try:
+                self.vacuum()
+            except sqlite3.Error:
+                pass
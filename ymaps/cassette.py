@@ -0,0 +1,275 @@
+"""
+Recording and replay of API traffic for ymaps
+"""
+
+import base64
+import gzip
+import json
+import os
+import threading
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from httpx import (
+    AsyncBaseTransport,
+    AsyncHTTPTransport,
+    BaseTransport,
+    HTTPTransport,
+    Limits,
+    Request,
+    Response,
+    URL,
+)
+
+from ymaps.api_parameters import request_key
+from ymaps.settings import DefaultSettings
+
+
+Record = Tuple[int, List[Tuple[str, str]], bytes]
+
+
+class CassetteMiss(LookupError):
+    """The replayed request was not recorded"""
+
+
+class Cassette:
+    """
+    Append-only gzip file of requests and responses, one JSON line per request
+
+    In record mode every response is appended to the file, an existing file
+    is continued and records flushed by a crashed session are kept. In replay
+    mode requests are served from the file without network, repeated requests
+    get the recorded responses in order and then the last one. Requests are
+    matched by canonical parameters, the api key is neither matched nor recorded
+    """
+
+    modes = ("record", "replay")
+
+    def __init__(self, path: str, mode: str = "replay"):
+        if mode not in self.modes:
+            raise ValueError("mode must be one of {}".format(", ".join(self.modes)))
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._file: Optional[gzip.GzipFile] = None
+        self._records: Dict[str, List[Record]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+
+        if mode == "record":
+            if os.path.exists(path):
+                repair(path)
+            self._file = gzip.open(path, "ab")
+        else:
+            for url, record in self.records():
+                self._records[get_key(url)].append(record)
+
+    def records(self) -> Iterator[Tuple[str, Record]]:
+        """Yields (url, (status, headers, content)) of the file, a truncated end is skipped"""
+        with gzip.open(self.path, "rb") as file:
+            try:
+                for line in file:
+                    entry = json.loads(line)
+                    headers = [(name, value) for name, value in entry["headers"]]
+                    content = base64.b64decode(entry["content"])
+                    yield entry["url"], (entry["status"], headers, content)
+            except (EOFError, zlib.error, ValueError):
+                return
+
+    def record(self, request: Request, status: int, headers: List, content: bytes):
+        url = request.url.copy_remove_param("apikey")
+        line = json.dumps(
+            {
+                "url": str(url),
+                "status": status,
+                "headers": headers,
+                "content": base64.b64encode(content).decode(),
+            },
+            ensure_ascii=False,
+        )
+        if self._file is None:
+            raise ValueError("The cassette is opened for replay")
+        with self._lock:
+            self._file.write(line.encode() + b"\n")
+            # a synced block can be read back even if the process crashes
+            self._file.flush()
+
+    def replay(self, request: Request) -> Response:
+        key = get_key(str(request.url))
+        with self._lock:
+            records = self._records.get(key)
+            if not records:
+                raise CassetteMiss(str(request.url.copy_remove_param("apikey")))
+            index = min(self._served[key], len(records) - 1)
+            self._served[key] += 1
+        status, headers, content = records[index]
+        return Response(status, headers=headers, content=content, request=request)
+
+    def warm(self, client) -> int:
+        """Puts successful responses of the client's service into its cache"""
+        if client._cache is None:
+            raise ValueError("The client has no cache to warm")
+        base_url = str(client._client.base_url)
+        path = client._url.rstrip("/")
+        count = 0
+        for url, (status, headers, content) in self.records():
+            if status != 200 or url.partition("?")[0].rstrip("/") != path:
+                continue
+            response = Response(status, headers=headers, content=content)
+            key = request_key(base_url, dict(URL(url).params))
+            client._cache.set(key, response, client.SERVICE)
+            count += 1
+        return count
+
+    def transport(
+        self,
+        transport: Optional[BaseTransport] = None,
+        limits: Limits = DefaultSettings.limits,
+        http2: bool = False,
+    ) -> "CassetteTransport":
+        """Transport of a sync client, transport is used in record mode"""
+        return CassetteTransport(self, transport, limits, http2)
+
+    def async_transport(
+        self,
+        transport: Optional[AsyncBaseTransport] = None,
+        limits: Limits = DefaultSettings.limits,
+        http2: bool = False,
+    ) -> "AsyncCassetteTransport":
+        """Transport of an async client, transport is used in record mode"""
+        return AsyncCassetteTransport(self, transport, limits, http2)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CassetteTransport(BaseTransport):
+    """
+    Records responses of transport or replays them, a transport created
+    for lack of one is closed with the client
+    """
+
+    def __init__(self, cassette, transport, limits, http2):
+        self.cassette = cassette
+        self.owned = transport is None and cassette.mode == "record"
+        if self.owned:
+            transport = HTTPTransport(limits=limits, http2=http2)
+        self.transport = transport
+
+    def handle_request(self, request: Request) -> Response:
+        if self.cassette.mode == "replay":
+            return self.cassette.replay(request)
+
+        response = self.transport.handle_request(request)
+        try:
+            content = b"".join(response.stream)  # type: ignore
+        finally:
+            response.close()
+        headers = list(response.headers.multi_items())
+        self.cassette.record(request, response.status_code, headers, content)
+        return Response(
+            response.status_code,
+            headers=headers,
+            content=content,
+            extensions=response.extensions,
+            request=request,
+        )
+
+    def close(self) -> None:
+        if self.owned:
+            self.transport.close()
+
+
+class AsyncCassetteTransport(AsyncBaseTransport):
+    """
+    Async version of CassetteTransport
+    """
+
+    def __init__(self, cassette, transport, limits, http2):
+        self.cassette = cassette
+        self.owned = transport is None and cassette.mode == "record"
+        if self.owned:
+            transport = AsyncHTTPTransport(limits=limits, http2=http2)
+        self.transport = transport
+
+    async def handle_async_request(self, request: Request) -> Response:
+        if self.cassette.mode == "replay":
+            return self.cassette.replay(request)
+
+        response = await self.transport.handle_async_request(request)
+        try:
+            content = b"".join([chunk async for chunk in response.stream])  # type: ignore
+        finally:
+            await response.aclose()
+        headers = list(response.headers.multi_items())
+        self.cassette.record(request, response.status_code, headers, content)
+        return Response(
+            response.status_code,
+            headers=headers,
+            content=content,
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        if self.owned:
+            await self.transport.aclose()
+
+
+def get_key(url: str) -> str:
+    """Canonical key of a request URL without the api key"""
+    return request_key(url.partition("?")[0], dict(URL(url).params))
+
+
+def repair(path: str) -> None:
+    """
+    Completes the last gzip member of a file left by a crashed record session:
+    the file is cut to its complete members and the lines of the last one,
+    which were flushed before the crash, are written again
+    """
+    size = complete_size(path)
+    if size == os.path.getsize(path):
+        return
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    data = b""
+    with open(path, "rb") as file:
+        file.seek(size)
+        for chunk in iter(lambda: file.read(DefaultSettings.chunk_size), b""):
+            try:
+                data += decompressor.decompress(chunk)
+            except zlib.error:
+                break
+    with open(path, "r+b") as file:
+        file.truncate(size)
+    data = data[: data.rfind(b"\n") + 1]
+    if data:
+        with gzip.open(path, "ab") as file:
+            file.write(data)
+
+
+def complete_size(path: str) -> int:
+    """Size of the complete gzip members at the start of a file"""
+    size = read = 0
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(DefaultSettings.chunk_size), b""):
+            while chunk:
+                try:
+                    decompressor.decompress(chunk)
+                except zlib.error:
+                    return size
+                read += len(chunk)
+                if not decompressor.eof:
+                    break
+                # the rest of the chunk starts the next member
+                chunk = decompressor.unused_data
+                size = read = read - len(chunk)
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    return size
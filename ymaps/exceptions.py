@@ -7,7 +7,10 @@ class Exceptions:
     def __init__(self, response):
         self.response = response
         self.status_code = response.status_code
-        self.text = response.text
+
+    @property
+    def text(self):
+        return self.response.text
 
     def get_exception_or_response(self):
         if self.status_code == 200:
@@ -0,0 +1,30 @@
+"""
+File helpers for ymaps
+"""
+
+import os
+import tempfile
+from typing import IO
+
+
+def _get_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# read once, os.umask can only be read by setting it for the whole process
+UMASK = _get_umask()
+
+
+def temporary_file(path: str) -> IO[bytes]:
+    """
+    Creates a temporary file in the directory of path, which replaces path with
+    os.replace when complete. The file gets the permissions of a file created
+    with open instead of the private mode of tempfile
+    """
+    file = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(path)), delete=False
+    )
+    os.chmod(file.name, 0o666 & ~UMASK)
+    return file
@@ -0,0 +1,243 @@
+"""
+Request metrics for ymaps clients
+"""
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from httpx import Response, ResponseNotRead
+
+from ymaps.settings import DefaultSettings
+
+
+Labels = Tuple[str, str]
+
+
+class _Shard:
+    """Metrics of one thread, only the owning thread writes to it"""
+
+    counters = ("requests", "in_flight", "bytes", "cache_hits", "statuses", "exceptions")
+
+    def __init__(self, buckets: int):
+        self.requests: Dict[Labels, int] = defaultdict(int)
+        self.in_flight: Dict[Labels, int] = defaultdict(int)
+        self.bytes: Dict[Labels, int] = defaultdict(int)
+        self.cache_hits: Dict[Labels, int] = defaultdict(int)
+        self.statuses: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.exceptions: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        # bucket counts, the last one is +Inf
+        self.latency: Dict[Labels, List[int]] = defaultdict(lambda: [0] * (buckets + 1))
+        self.latency_sum: Dict[Labels, float] = defaultdict(float)
+
+    def merge(self, shard: "_Shard") -> None:
+        """Adds metrics of another shard"""
+        for name in self.counters + ("latency_sum",):
+            values = getattr(self, name)
+            for key, value in list(getattr(shard, name).items()):
+                values[key] += value
+        for labels, counts in list(shard.latency.items()):
+            self.latency[labels] = [a + b for a, b in zip(self.latency[labels], counts)]
+
+
+class Observation:
+    """
+    Measures a request of a client method, see MetricsRegistry.observe.
+    The response is assigned once it is received, cache_hit is set when
+    it was taken from the response cache
+    """
+
+    __slots__ = ("registry", "labels", "response", "cache_hit", "_start")
+
+    def __init__(self, registry: "MetricsRegistry", labels: Labels):
+        self.registry = registry
+        self.labels = labels
+        self.response: Optional[Response] = None
+        self.cache_hit = False
+
+    def __enter__(self) -> "Observation":
+        self.registry._shard().in_flight[self.labels] += 1
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.registry._record(
+            self.labels,
+            time.perf_counter() - self._start,
+            self.response,
+            exc_type,
+            self.cache_hit,
+        )
+
+
+class MetricsRegistry:
+    """
+    Counts requests, response statuses, exceptions, received bytes and
+    requests in flight and builds latency histograms per service and method.
+
+    Responses taken from the response cache are counted as cache hits,
+    not as requests.
+
+    Every thread accumulates metrics in its own shard without locks,
+    shards are merged by snapshot() and prometheus(). Shards of finished
+    threads are folded into a common one
+    """
+
+    def __init__(self, buckets: Sequence[float] = DefaultSettings.metrics_buckets):
+        self.buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, _Shard]] = []
+        self._finished = _Shard(len(self.buckets))
+        self._lock = threading.Lock()
+
+    def observe(self, service: str, method: str) -> Observation:
+        """
+        Context manager measuring a request
+
+            >>> with registry.observe('search', 'search') as observation:
+            >>>     observation.response = client.get(...)
+        """
+        return Observation(self, (service, method))
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(len(self.buckets))
+            with self._lock:
+                self._fold()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _fold(self) -> None:
+        """Merges shards of finished threads into one, called with the lock held"""
+        shards = self._shards
+        self._shards = []
+        for thread, shard in shards:
+            if thread.is_alive():
+                self._shards.append((thread, shard))
+            else:
+                self._finished.merge(shard)
+
+    def _record(self, labels, duration, response, exc_type, cache_hit=False) -> None:
+        shard = self._shard()
+        shard.in_flight[labels] -= 1
+        if exc_type is not None:
+            shard.exceptions[labels + (exc_type.__name__,)] += 1
+        if cache_hit:
+            shard.cache_hits[labels] += 1
+            return
+        shard.requests[labels] += 1
+        shard.latency[labels][bisect.bisect_left(self.buckets, duration)] += 1
+        shard.latency_sum[labels] += duration
+        if response is not None:
+            shard.statuses[labels + (response.status_code,)] += 1
+            shard.bytes[labels] += body_size(response)
+
+    def snapshot(self) -> Dict:
+        """
+        Returns metrics by service and method:
+            {'search': {'search': {'requests': 1, 'in_flight': 0, 'bytes': 1024,
+                'cache_hits': 0, 'statuses': {200: 1}, 'exceptions': {},
+                'latency': {'buckets': {0.005: 0, ..., inf: 1}, 'sum': 0.1, 'count': 1}}}}
+        Bucket counts are cumulative as in Prometheus
+        """
+        merged = _Shard(len(self.buckets))
+        with self._lock:
+            self._fold()
+            merged.merge(self._finished)
+            for _, shard in self._shards:
+                merged.merge(shard)
+
+        result: Dict = {}
+
+        def get_entry(service, method):
+            methods = result.setdefault(service, {})
+            if method not in methods:
+                methods[method] = {
+                    "requests": 0,
+                    "in_flight": 0,
+                    "bytes": 0,
+                    "cache_hits": 0,
+                    "statuses": {},
+                    "exceptions": {},
+                    "latency": [0] * (len(self.buckets) + 1),
+                    "latency_sum": 0.0,
+                }
+            return methods[method]
+
+        for name in ("requests", "in_flight", "bytes", "cache_hits", "latency_sum", "latency"):
+            for labels, value in getattr(merged, name).items():
+                get_entry(*labels)[name] = value
+        for (service, method, status), count in merged.statuses.items():
+            get_entry(service, method)["statuses"][status] = count
+        for (service, method, name), count in merged.exceptions.items():
+            get_entry(service, method)["exceptions"][name] = count
+
+        for methods in result.values():
+            for entry in methods.values():
+                counts, total = entry.pop("latency"), 0
+                buckets = {}
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    total += count
+                    buckets[bound] = total
+                entry["latency"] = {
+                    "buckets": buckets,
+                    "sum": entry.pop("latency_sum"),
+                    "count": total,
+                }
+        return result
+
+    def prometheus(self, prefix: str = "ymaps") -> str:
+        """Returns metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        families: Dict[str, Tuple[str, str, List[str]]] = {
+            "requests_total": ("counter", "Requests of client methods", []),
+            "responses_total": ("counter", "Responses by status code", []),
+            "exceptions_total": ("counter", "Raised exceptions by class", []),
+            "received_bytes_total": ("counter", "Bytes of response bodies", []),
+            "cache_hits_total": ("counter", "Responses taken from the response cache", []),
+            "requests_in_flight": ("gauge", "Requests in progress", []),
+            "request_duration_seconds": ("histogram", "Request duration", []),
+        }
+
+        def add(family, labels, value, suffix=""):
+            text = ",".join('{}="{}"'.format(name, label) for name, label in labels)
+            families[family][2].append(
+                "{}_{}{}{{{}}} {}".format(prefix, family, suffix, text, value)
+            )
+
+        for service, methods in sorted(snapshot.items()):
+            for method, entry in sorted(methods.items()):
+                labels = [("service", service), ("method", method)]
+                add("requests_total", labels, entry["requests"])
+                for status, count in sorted(entry["statuses"].items()):
+                    add("responses_total", labels + [("status", status)], count)
+                for name, count in sorted(entry["exceptions"].items()):
+                    add("exceptions_total", labels + [("exception", name)], count)
+                add("received_bytes_total", labels, entry["bytes"])
+                add("cache_hits_total", labels, entry["cache_hits"])
+                add("requests_in_flight", labels, entry["in_flight"])
+                latency = entry["latency"]
+                for bound, count in latency["buckets"].items():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    add("request_duration_seconds", labels + [("le", le)], count, "_bucket")
+                add("request_duration_seconds", labels, latency["sum"], "_sum")
+                add("request_duration_seconds", labels, latency["count"], "_count")
+
+        lines = []
+        for family, (kind, description, samples) in families.items():
+            name = "{}_{}".format(prefix, family)
+            lines.append("# HELP {} {}".format(name, description))
+            lines.append("# TYPE {} {}".format(name, kind))
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def body_size(response: Response) -> int:
+    """Size of a read body or the number of bytes streamed so far"""
+    try:
+        return len(response.content)
+    except ResponseNotRead:
+        return response.num_bytes_downloaded
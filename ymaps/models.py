@@ -0,0 +1,205 @@
+"""
+Typed results for ymaps responses
+
+Models keep only the source values of their fields, not the response,
+and decode fields on first access
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+Point = Tuple[float, float]
+
+
+class lazy:
+    """Property computed on first access and stored in the slot "_<name>" """
+
+    def __init__(self, method):
+        self.method = method
+        self.slot = "_" + method.__name__
+        self.__doc__ = method.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return getattr(instance, self.slot)
+        except AttributeError:
+            value = self.method(instance)
+            setattr(instance, self.slot, value)
+            return value
+
+
+def _parse_pos(pos: str) -> Point:
+    lon, lat = pos.split()
+    return float(lon), float(lat)
+
+
+class GeoObject:
+    """
+    Geocoder result, a GeoObject of the featureMember list
+
+    Only the source values of the fields are kept, the GeoObject dict is kept
+    in raw with keep_raw=True
+
+        >>> objects = GeoObject.from_response(Geocode('api_key').geocode('Москва'))
+        >>> objects[0].point
+        (37.617698, 55.755864)
+    """
+
+    __slots__ = (
+        "raw",
+        "name",
+        "description",
+        "kind",
+        "precision",
+        "text",
+        "formatted",
+        "postal_code",
+        "country_code",
+        "address_components",
+        "_pos",
+        "_envelope",
+        "_point",
+        "_bounds",
+    )
+
+    def __init__(self, raw: Dict, keep_raw: bool = False):
+        self.raw = raw if keep_raw else None
+        metadata = raw.get("metaDataProperty", {}).get("GeocoderMetaData", {})
+        address = metadata.get("Address", {})
+        self.name: str = raw.get("name", "")
+        self.description: str = raw.get("description", "")
+        self.kind: Optional[str] = metadata.get("kind")
+        self.precision: Optional[str] = metadata.get("precision")
+        self.text: str = metadata.get("text", "")
+        self.formatted: str = address.get("formatted") or self.text
+        self.postal_code: Optional[str] = address.get("postal_code")
+        self.country_code: Optional[str] = address.get("country_code")
+        self._pos: str = raw["Point"]["pos"]
+        envelope = raw.get("boundedBy", {}).get("Envelope")
+        self._envelope = (
+            (envelope["lowerCorner"], envelope["upperCorner"]) if envelope else None
+        )
+        # address components as (kind, name) from the country to the house
+        self.address_components: Tuple[Tuple[str, str], ...] = tuple(
+            (component["kind"], component["name"])
+            for component in address.get("Components", [])
+        )
+
+    @classmethod
+    def from_response(cls, response: Dict, keep_raw: bool = False) -> List["GeoObject"]:
+        members = response["response"]["GeoObjectCollection"]["featureMember"]
+        return [cls(member["GeoObject"], keep_raw) for member in members]
+
+    @lazy
+    def point(self) -> Point:
+        """Coordinates as (longitude, latitude)"""
+        return _parse_pos(self._pos)
+
+    @lazy
+    def bounds(self) -> Optional[Tuple[Point, Point]]:
+        if self._envelope is None:
+            return None
+        lower, upper = self._envelope
+        return _parse_pos(lower), _parse_pos(upper)
+
+    @property
+    def metadata(self) -> Dict:
+        """GeocoderMetaData, requires keep_raw=True"""
+        return _kept(self.raw).get("metaDataProperty", {}).get("GeocoderMetaData", {})
+
+    @property
+    def address(self) -> Dict:
+        """Address of GeocoderMetaData, requires keep_raw=True"""
+        return self.metadata.get("Address", {})
+
+    def __repr__(self):
+        return "GeoObject({!r})".format(self.formatted)
+
+
+class SearchFeature:
+    """
+    Search result, a Feature of the features list
+
+    Only the source values of the fields are kept, the Feature dict is kept
+    in raw with keep_raw=True
+
+        >>> features = SearchFeature.from_response(Search('api_key').search('кафе'))
+        >>> features[0].company["name"]
+    """
+
+    __slots__ = (
+        "raw",
+        "name",
+        "description",
+        "company",
+        "kind",
+        "formatted",
+        "_coordinates",
+        "_bounded_by",
+        "_point",
+        "_bounds",
+        "_categories",
+        "_phones",
+    )
+
+    def __init__(self, raw: Dict, keep_raw: bool = False):
+        self.raw = raw if keep_raw else None
+        properties = raw.get("properties", {})
+        metadata = properties.get("GeocoderMetaData", {})
+        self.name: str = properties.get("name", "")
+        self.description: str = properties.get("description", "")
+        # CompanyMetaData of an organization, None for toponyms
+        self.company: Optional[Dict] = properties.get("CompanyMetaData")
+        self.kind: Optional[str] = metadata.get("kind")
+        if self.company is not None:
+            self.formatted: str = self.company.get("address", "")
+        else:
+            self.formatted = metadata.get("text", "")
+        self._coordinates: List[float] = raw["geometry"]["coordinates"]
+        self._bounded_by: Optional[List[List[float]]] = properties.get("boundedBy")
+
+    @classmethod
+    def from_response(cls, response: Dict, keep_raw: bool = False) -> List["SearchFeature"]:
+        return [cls(feature, keep_raw) for feature in response.get("features", [])]
+
+    @property
+    def properties(self) -> Dict:
+        """Properties of the Feature, requires keep_raw=True"""
+        return _kept(self.raw).get("properties", {})
+
+    @lazy
+    def point(self) -> Point:
+        """Coordinates as (longitude, latitude)"""
+        lon, lat = self._coordinates
+        return float(lon), float(lat)
+
+    @lazy
+    def bounds(self) -> Optional[Tuple[Point, Point]]:
+        if not self._bounded_by:
+            return None
+        (left, bottom), (right, top) = self._bounded_by
+        return (float(left), float(bottom)), (float(right), float(top))
+
+    @property
+    def is_company(self) -> bool:
+        return self.company is not None
+
+    @lazy
+    def categories(self) -> Tuple[str, ...]:
+        company = self.company or {}
+        return tuple(category["name"] for category in company.get("Categories", []))
+
+    @lazy
+    def phones(self) -> Tuple[str, ...]:
+        company = self.company or {}
+        return tuple(phone["formatted"] for phone in company.get("Phones", []))
+
+    def __repr__(self):
+        return "SearchFeature({!r})".format(self.name)
+
+
+def _kept(raw: Optional[Dict]) -> Dict:
+    if raw is None:
+        raise ValueError("raw is kept only for models created with keep_raw=True")
+    return raw
@@ -0,0 +1,97 @@
+"""
+Address normalization and duplicate elimination for ymaps
+"""
+
+import re
+from typing import Callable, Dict, Hashable, Iterable, List, Tuple
+
+
+ABBREVIATIONS = {
+    "ул": "улица",
+    "пр": "проспект",
+    "пр-т": "проспект",
+    "просп": "проспект",
+    "пр-д": "проезд",
+    "пер": "переулок",
+    "б-р": "бульвар",
+    "бул": "бульвар",
+    "ш": "шоссе",
+    "наб": "набережная",
+    "пл": "площадь",
+    "туп": "тупик",
+    "мкр": "микрорайон",
+    "мкрн": "микрорайон",
+    "г": "город",
+    "обл": "область",
+    "р-н": "район",
+    "респ": "республика",
+    "д": "дом",
+    "к": "корпус",
+    "корп": "корпус",
+    "стр": "строение",
+    "кв": "квартира",
+}
+
+TOKEN = re.compile(r"[\w/-]+")
+
+
+def normalize_address(text: str) -> str:
+    """
+    Lowercases an address, replaces ё with е, drops punctuation and expands
+    abbreviations: "Москва, ул. Тверская, д.7" -> "москва улица тверская дом 7"
+    """
+    tokens = []
+    for token in TOKEN.findall(text.casefold().replace("ё", "е")):
+        token = ABBREVIATIONS.get(token) or token.strip("-/")
+        if token:
+            tokens.append(token)
+    return " ".join(tokens)
+
+
+class Deduplicator:
+    """
+    Sends each distinct query once: queries are grouped by their normalized form,
+    the first query of a group is sent and its result is returned for the whole
+    group. Strings are normalized with normalize, other queries, e.g. coordinates
+    of reverse geocoding, are compared as tuples. Counts are accumulated over calls
+    """
+
+    def __init__(self, normalize: Callable[[str], str] = normalize_address):
+        self.normalize = normalize
+        self.queries = 0
+        self.requests = 0
+
+    def key(self, query) -> Hashable:
+        if isinstance(query, str):
+            return self.normalize(query)
+        if isinstance(query, (list, tuple)):
+            return tuple(query)
+        return query
+
+    def group(self, queries: Iterable) -> Tuple[List, List[int]]:
+        """Returns distinct queries and the position of every query among them"""
+        positions: Dict[Hashable, int] = {}
+        unique: List = []
+        indexes = []
+        for query in queries:
+            key = self.key(query)
+            if key not in positions:
+                positions[key] = len(unique)
+                unique.append(query)
+            indexes.append(positions[key])
+        self.count(len(indexes), len(unique))
+        return unique, indexes
+
+    def count(self, queries: int, requests: int) -> None:
+        self.queries += queries
+        self.requests += requests
+
+    @property
+    def stats(self) -> Dict:
+        saved = self.queries - self.requests
+        return {
+            "queries": self.queries,
+            "requests": self.requests,
+            "saved": saved,
+            "saved_ratio": saved / self.queries if self.queries else 0.0,
+        }
@@ -0,0 +1,36 @@
+"""
+Result pages of ymaps responses
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+Page = Tuple[List[Dict], Optional[int]]
+
+
+def check_page(results: int, skip: int) -> None:
+    if results <= 0:
+        raise ValueError("results must be positive")
+    if skip % results:
+        raise ValueError("skip must be divisible by results")
+
+
+def has_next_page(page: Page, results: int, skip: int) -> bool:
+    """Checks whether there are results after the page, skip includes the page"""
+    items, found = page
+    return len(items) == results and (found is None or skip < found)
+
+
+def search_page(response: Dict) -> Page:
+    """Features of a search response and the number of found objects"""
+    metadata = response.get("properties", {}).get("ResponseMetaData", {})
+    found = metadata.get("SearchResponse", {}).get("found")
+    return response.get("features", []), found
+
+
+def geocode_page(response: Dict) -> Page:
+    """featureMember list of a geocoder response and the number of found objects"""
+    collection = response["response"]["GeoObjectCollection"]
+    metadata = collection.get("metaDataProperty", {})
+    found = metadata.get("GeocoderResponseMetaData", {}).get("found")
+    return collection.get("featureMember", []), None if found is None else int(found)
@@ -0,0 +1,148 @@
+"""
+Prefix trie cache of suggestions for ymaps
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from ymaps.api_parameters import request_key
+from ymaps.settings import DefaultSettings
+
+
+class _Node:
+    __slots__ = ("parent", "char", "children", "result", "complete")
+
+    def __init__(self, parent: Optional["_Node"] = None, char: str = ""):
+        self.parent = parent
+        self.char = char
+        self.children: Dict[str, "_Node"] = {}
+        self.result: Optional[Dict] = None
+        self.complete = False
+
+
+class PrefixCache:
+    """
+    Cache of suggestions stored in a prefix trie for every context,
+    the context is formed by all request parameters except text
+
+    A result is complete when the api returned fewer results than requested.
+    With filter_prefixes=True a longer text is answered by filtering the
+    complete result of its prefix: "санкт-п" is answered from "санкт".
+    When max_entries is exceeded, the least recently used entry is evicted
+    together with its subtree
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DefaultSettings.cache_max_entries,
+        filter_prefixes: bool = False,
+    ):
+        self.max_entries = max_entries
+        self.filter_prefixes = filter_prefixes
+
+        self.hits = 0
+        self.filtered_hits = 0
+        self.misses = 0
+        self._roots: Dict[str, _Node] = {}
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, params: Dict) -> Optional[Dict]:
+        """Returns cached suggestions for request parameters including text"""
+        context, text = self._split(params)
+        with self._lock:
+            node = self._roots.get(context)
+            prefix_node = prefix_result = None
+            for char in text:
+                if node is None:
+                    break
+                if node.complete:
+                    prefix_node, prefix_result = node, node.result
+                node = node.children.get(char)
+
+            if node is not None and node.result is not None:
+                self._entries.move_to_end(node)
+                self.hits += 1
+                return node.result
+
+            if self.filter_prefixes and prefix_result is not None:
+                self._entries.move_to_end(prefix_node)
+                self.filtered_hits += 1
+                return _filter_result(prefix_result, text)
+
+            self.misses += 1
+            return None
+
+    def set(self, params: Dict, result: Dict) -> None:
+        context, text = self._split(params)
+        requested = int(params.get("results", DefaultSettings.suggest_results))
+        with self._lock:
+            node = self._roots.setdefault(context, _Node())
+            for char in text:
+                node = node.children.setdefault(char, _Node(node, char))
+
+            node.result = result
+            node.complete = len(result.get("results", [])) < requested
+            self._entries[node] = context
+            self._entries.move_to_end(node)
+
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._roots.clear()
+            self._entries.clear()
+
+    @property
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "filtered_hits": self.filtered_hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _split(self, params):
+        params = dict(params)
+        text = " ".join(str(params.pop("text", "")).casefold().split())
+        return request_key("", params), text
+
+    def _evict(self, node):
+        """Removes the node with its subtree from the trie"""
+        context = self._entries[node]
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self._entries.pop(current, None)
+            stack.extend(current.children.values())
+
+        if node.parent is None:
+            del self._roots[context]
+            return
+        del node.parent.children[node.char]
+        # remove branches left without results, and the root of an empty context
+        parent = node.parent
+        while parent.result is None and not parent.children:
+            if parent.parent is None:
+                del self._roots[context]
+                return
+            del parent.parent.children[parent.char]
+            parent = parent.parent
+
+
+def _filter_result(result: Dict, text: str) -> Dict:
+    """Keeps suggestions where every word of text starts a word of the title or subtitle"""
+    words = text.replace("-", " ").split()
+    items = []
+    for item in result.get("results", []):
+        title = item.get("title", {}).get("text", "")
+        subtitle = item.get("subtitle", {}).get("text", "")
+        item_words = (title + " " + subtitle).casefold().replace("-", " ").split()
+        if all(any(w.startswith(word) for w in item_words) for word in words):
+            items.append(item)
+    return {**result, "results": items}
@@ -0,0 +1,91 @@
+"""
+Client-side rate limiting for ymaps
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class TokenBucket:
+    """
+    Token bucket with `rate` tokens per second and room for `capacity` tokens,
+    at least one, so that the first request is never delayed
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = max(1.0, capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token and returns the time to wait until it becomes available"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """
+    Token buckets for every pair of service and api key
+
+    The rate is taken from key_rate for the api key, then from service_rate
+    for the service ("search", "geocode", "suggest", "static"), then the
+    default rate is used. Burst is the bucket capacity, by default one second
+    of requests
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        service_rate: Optional[Dict[str, float]] = None,
+        key_rate: Optional[Dict[str, float]] = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.service_rate = service_rate or {}
+        self.key_rate = key_rate or {}
+        self._buckets: Dict[Tuple[str, Optional[str]], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def get_bucket(self, service: str, api_key: Optional[str]) -> TokenBucket:
+        bucket = self._buckets.get((service, api_key))
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.setdefault(
+                    (service, api_key),
+                    TokenBucket(self.get_rate(service, api_key), self.burst),
+                )
+        return bucket
+
+    def get_rate(self, service: str, api_key: Optional[str]) -> float:
+        if api_key in self.key_rate:
+            return self.key_rate[api_key]
+        return self.service_rate.get(service, self.rate)
+
+    def acquire(self, service: str, api_key: Optional[str]) -> None:
+        """Blocks until a request can be sent"""
+        self.get_bucket(service, api_key).acquire()
+
+    async def acquire_async(self, service: str, api_key: Optional[str]) -> None:
+        """Waits without blocking the event loop until a request can be sent"""
+        await self.get_bucket(service, api_key).acquire_async()
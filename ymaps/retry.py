@@ -0,0 +1,95 @@
+"""
+Retry policy for ymaps
+"""
+
+import random
+import threading
+from typing import Iterable, Optional, Tuple, Type
+
+from httpx import Response, TransportError
+
+from ymaps.settings import DefaultSettings
+
+
+class RetryBudget:
+    """
+    Limits retries to `ratio` of requests
+
+    Every request deposits `ratio` tokens and every retry withdraws one.
+    The balance is capped by `reserve`, which also allows a few retries
+    before any traffic was seen
+    """
+
+    def __init__(
+        self,
+        ratio: float = DefaultSettings.retry_budget_ratio,
+        reserve: float = DefaultSettings.retry_budget_reserve,
+    ):
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = reserve
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.reserve, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    """
+    Retries requests failed with a transient status code or transport error
+
+    Delays grow exponentially from backoff up to max_backoff with full jitter.
+    Invalid parameters (400) and invalid key (403) are never retried.
+    Clients sharing a policy share its retry budget
+    """
+
+    never_retried = (400, 403)
+
+    def __init__(
+        self,
+        attempts: int = DefaultSettings.retry_attempts,
+        statuses: Iterable[int] = DefaultSettings.retry_statuses,
+        exceptions: Tuple[Type[Exception], ...] = (TransportError,),
+        backoff: float = DefaultSettings.retry_backoff,
+        max_backoff: float = DefaultSettings.retry_max_backoff,
+        budget: Optional[RetryBudget] = None,
+    ):
+        self.statuses = frozenset(statuses)
+        if self.statuses.intersection(self.never_retried):
+            raise ValueError("Statuses 400 and 403 can't be retried")
+
+        self.attempts = attempts
+        self.exceptions = exceptions
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget = budget or RetryBudget()
+
+    def should_retry(
+        self,
+        attempt: int,
+        response: Optional[Response] = None,
+        exception: Optional[Exception] = None,
+    ) -> bool:
+        """Checks whether the failed attempt (counted from 0) should be retried"""
+        if attempt + 1 >= self.attempts:
+            return False
+        if response is not None and response.status_code not in self.statuses:
+            return False
+        if exception is not None and not isinstance(exception, self.exceptions):
+            return False
+        return self.budget.withdraw()
+
+    def get_delay(self, attempt: int, response: Optional[Response] = None) -> float:
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        retry_after = response.headers.get("retry-after") if response else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(self.max_backoff, float(retry_after)))
+        return delay
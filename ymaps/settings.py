@@ -2,12 +2,38 @@
 Default Settings for ymaps
 """
 
-from typing import Dict
+import json
+
+from httpx import Limits
+from typing import Dict, Tuple
 
 
 class DefaultSettings:
     static_url = "v1"
     timeout = 1
+    concurrency = 10
+    chunk_size = 64 * 1024
+    page_size = 50
+    limits = Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=5)
+    cache_max_entries = 10000
+    cache_max_bytes = 64 * 1024 * 1024
+    cache_ttl = 3600
+    cache_vacuum_interval = 600
+    retry_attempts = 3
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+    retry_backoff = 0.1
+    retry_max_backoff = 2.0
+    retry_budget_ratio = 0.1
+    retry_budget_reserve = 10.0
     language = "ru_RU"
     suggest_language = "ru"
+    suggest_debounce = 0.15
+    suggest_results = 7
+    bulk_checkpoint_interval = 1000
+    bulk_window_factor = 4
+    dedup_max_entries = 100000
+    metrics_buckets: Tuple[float, ...] = (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+    )
     client_settings: Dict = {}
+    json_loads = staticmethod(json.loads)
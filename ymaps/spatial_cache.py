@@ -0,0 +1,136 @@
+"""
+Spatial cache of reverse geocoding results for ymaps
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from ymaps.api_parameters import request_key
+from ymaps.settings import DefaultSettings
+
+METERS_PER_DEGREE = 111320
+
+
+class ReverseCache:
+    """
+    Cache of reverse geocoding results indexed by a grid of cells
+
+    A cached result is returned for a point within the tolerance radius
+    (in meters) of the point it was requested for. The radius depends on
+    kind and is also the size of grid cells, so a lookup checks 3x3 cells.
+    The context of a result is formed by all request parameters except
+    coordinates, coordinates in sco=latlong order are swapped
+    """
+
+    default_tolerance = {
+        None: 15,
+        "house": 15,
+        "street": 50,
+        "metro": 300,
+        "district": 500,
+        "locality": 1000,
+    }
+
+    def __init__(
+        self,
+        tolerance: Optional[Dict[Optional[str], float]] = None,
+        max_entries: int = DefaultSettings.cache_max_entries,
+    ):
+        self.tolerance = {**self.default_tolerance, **(tolerance or {})}
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self._cells: Dict[Tuple, Set[Tuple]] = {}
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, params: Dict) -> Optional[Any]:
+        """Returns a cached result for request parameters including geocode"""
+        context, kind, lon, lat = self._split(params)
+        tolerance = self.get_tolerance(kind)
+        row = self._row(lat, tolerance)
+        with self._lock:
+            nearest, nearest_distance = None, tolerance
+            for cell_row in (row - 1, row, row + 1):
+                column = self._column(lon, cell_row, tolerance)
+                for cell_column in (column - 1, column, column + 1):
+                    for point in self._cells.get((context, cell_row, cell_column), ()):
+                        distance = _distance(lon, lat, point[1], point[2])
+                        if distance <= nearest_distance:
+                            nearest, nearest_distance = point, distance
+
+            if nearest is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(nearest)
+            self.hits += 1
+            return self._entries[nearest][1]
+
+    def set(self, params: Dict, result: Any) -> None:
+        context, kind, lon, lat = self._split(params)
+        tolerance = self.get_tolerance(kind)
+        row = self._row(lat, tolerance)
+        cell = (context, row, self._column(lon, row, tolerance))
+        point = (context, lon, lat)
+        with self._lock:
+            self._cells.setdefault(cell, set()).add(point)
+            self._entries[point] = (cell, result)
+            self._entries.move_to_end(point)
+
+            while len(self._entries) > self.max_entries:
+                point, (cell, _) = self._entries.popitem(last=False)
+                self._cells[cell].discard(point)
+                if not self._cells[cell]:
+                    del self._cells[cell]
+
+    def get_tolerance(self, kind: Optional[str]) -> float:
+        return self.tolerance.get(kind, self.tolerance[None])
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    @property
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": len(self._entries),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cells.clear()
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _split(self, params):
+        params = dict(params)
+        first, second = map(float, str(params.pop("geocode")).split(","))
+        lon, lat = (
+            (second, first) if params.pop("sco", None) == "latlong" else (first, second)
+        )
+        return request_key("", params), params.get("kind"), lon, lat
+
+    def _row(self, lat, tolerance):
+        return math.floor(lat * METERS_PER_DEGREE / tolerance)
+
+    def _column(self, lon, row, tolerance):
+        # the width of a degree of longitude is taken at the middle of the row
+        lat = (row + 0.5) * tolerance / METERS_PER_DEGREE
+        width = METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6)
+        return math.floor(lon * width / tolerance)
+
+
+def _distance(lon1, lat1, lon2, lat2):
+    """Distance in meters on an equirectangular projection, precise for short distances"""
+    x = (lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = lat2 - lat1
+    return math.hypot(x, y) * METERS_PER_DEGREE
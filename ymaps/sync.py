@@ -2,12 +2,45 @@
 Synchronous Client for Yandex Maps API
 """
 
-from httpx import Client
-from typing import Dict, List, Optional
+import contextvars
+import os
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from httpx import BaseTransport, Client, Limits, QueryParams, Request, Response
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
 from ymaps.settings import DefaultSettings
 from ymaps.exceptions import Exceptions
-from ymaps.api_parameters import ParameterCollector
+from ymaps.api_parameters import (
+    COORDINATE_PAIR,
+    ParameterCollector,
+    encode_value,
+    request_key,
+)
+from ymaps.cache import BaseCache
+from ymaps.cassette import Cassette
+from ymaps.files import temporary_file
+from ymaps.ratelimit import RateLimiter
+from ymaps.retry import RetryPolicy
+from ymaps.metrics import MetricsRegistry
+from ymaps.normalize import Deduplicator
+from ymaps.tracing import Trace, current_trace, traced
+from ymaps.prefix_cache import PrefixCache
+from ymaps.spatial_cache import ReverseCache
+from ymaps.pagination import check_page, geocode_page, has_next_page, search_page
+
+
+class SharedTransport(BaseTransport):
+    """
+    Transport shared by several clients, closing a client does not close it
+    """
+
+    def __init__(self, transport: BaseTransport):
+        self.transport = transport
+
+    def handle_request(self, request: Request) -> Response:
+        return self.transport.handle_request(request)
 
 
 class BaseClient:
@@ -18,26 +51,225 @@ class BaseClient:
         https://yandex.ru/dev/maps/mapsapi/
     """
 
+    SERVICE = "base"
+    PREPARED_ARGUMENT = "text"
+
     def __init__(
         self,
         base_url: str,
         api_key: Optional[str],
         language: Optional[str] = DefaultSettings.language,
         timeout: Optional[int] = DefaultSettings.timeout,
+        cache: Optional[BaseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        transport: Optional[BaseTransport] = None,
+        limits: Limits = DefaultSettings.limits,
+        http2: bool = False,
+        json_loads: Callable[[bytes], Any] = DefaultSettings.json_loads,
+        metrics: Optional[MetricsRegistry] = None,
+        tracer: Optional[Callable[[Trace], None]] = None,
+        cassette: Optional[Cassette] = None,
     ):
+        self._cache = cache
+        self._metrics = metrics
+        self._tracer = tracer
+        self._rate_limiter = rate_limiter
+        self._retry = retry
+        self._api_key = api_key
+        self._json_loads = json_loads
+
         client_settings = {"lang": language}
         if api_key:
             client_settings["apikey"] = api_key
 
+        client_transport: Optional[BaseTransport] = None
+        if cassette is not None:
+            client_transport = cassette.transport(transport, limits, http2)
+        elif transport is not None:
+            client_transport = SharedTransport(transport)
+
         self._client = Client(
             base_url=base_url,
             params=client_settings,
             timeout=timeout,
+            transport=client_transport,
+            limits=limits,
+            http2=http2,
+        )
+        # the url of _get without the query, which prepared requests are joined to
+        self._url = str(self._client.build_request("GET", ".").url.copy_with(query=None))
+
+    def _get(self, request_parameters, query=None, method=None):
+        trace = current_trace()
+        if trace is not None:
+            trace.mark("ymaps.collect.complete")
+        if self._metrics is None:
+            response = self._fetch(request_parameters, query)
+            return Exceptions(response).get_exception_or_response()
+
+        with self._metrics.observe(self.SERVICE, method or self.SERVICE) as observation:
+            observation.response = self._fetch(request_parameters, query, observation)
+            return Exceptions(observation.response).get_exception_or_response()
+
+    def _fetch(self, request_parameters, query=None, observation=None):
+        response = None
+        if self._cache is not None:
+            key = self._request_key(request_parameters)
+            response = self._cache.get(key)
+            if response is not None and observation is not None:
+                observation.cache_hit = True
+        if response is None:
+            response = self._send(request_parameters, query)
+            if self._cache is not None:
+                self._cache.set(key, response, self.SERVICE)
+        return response
+
+    def _send(self, request_parameters, query=None, stream=False):
+        """
+        Sends a request with rate limiting and retries. With stream=True the
+        body of the returned response is not read and it must be closed
+        """
+        if self._retry is not None:
+            self._retry.budget.deposit()
+
+        trace = current_trace()
+        extensions = None if trace is None else {"trace": trace.event}
+        attempt = 0
+        while True:
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire(self.SERVICE, self._api_key)
+            if trace is not None:
+                trace.mark("ymaps.send.started")
+            response = None
+            try:
+                if query is None:
+                    request = self._client.build_request(
+                        "GET", ".", params=request_parameters, extensions=extensions
+                    )
+                else:
+                    request = self._build_request(query, extensions)
+                response = self._client.send(request, stream=stream)
+            except Exception as exception:
+                if self._retry is None or not self._retry.should_retry(
+                    attempt, exception=exception
+                ):
+                    raise
+            else:
+                if self._retry is None or not self._retry.should_retry(
+                    attempt, response=response
+                ):
+                    return response
+                response.close()
+            time.sleep(self._retry.get_delay(attempt, response))
+            attempt += 1
+
+    def _build_request(self, query: str, extensions: Optional[Dict] = None) -> Request:
+        """Builds a request with an encoded query, client parameters are not merged again"""
+        return Request(
+            "GET",
+            "{}?{}".format(self._url, query),
+            headers=self._client.headers,
+            extensions={"timeout": self._client.timeout.as_dict(), **(extensions or {})},
         )
 
-    def _get(self, request_parameters):
-        response = self._client.get(".", params=request_parameters)
-        return Exceptions(response).get_exception_or_response()
+    def _process(self, result: Any) -> Any:
+        """Converts the result of _get as the service method does"""
+        return self._decode(result)
+
+    def _decode(self, response: Response) -> Any:
+        """Decodes a JSON response body without decoding it to text first"""
+        trace = current_trace()
+        if trace is None:
+            return self._json_loads(response.content)
+        trace.mark("ymaps.decode.started")
+        result = self._json_loads(response.content)
+        trace.mark("ymaps.decode.complete")
+        return result
+
+    def _request_key(self, request_parameters) -> str:
+        params = {**self._client.params, **request_parameters}
+        return request_key(str(self._client.base_url), params)
+
+    def _gather(self, method, queries, concurrency, deduplicator=None, **params) -> List:
+        """
+        Calls method for every query in a pool of `concurrency` threads.
+        Results are returned in input order, errors are returned in place of results.
+        Calls run in copies of the caller's context. With a deduplicator, equal
+        queries are sent once and share the result
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        if deduplicator is not None:
+            queries, positions = deduplicator.group(queries)
+            unique_results = self._gather(method, queries, concurrency, **params)
+            return [unique_results[position] for position in positions]
+
+        context = contextvars.copy_context()
+
+        def call(query):
+            try:
+                return context.copy().run(method, query, **params)
+            except Exception as exception:
+                return exception
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(call, queries))
+
+    def _iter_pages(self, method, get_page, query, results, skip=0, **params):
+        """
+        Yields items of consecutive pages, the next page is requested
+        in a background thread while the current one is consumed
+        """
+        check_page(results, skip)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page = executor.submit(
+                contextvars.copy_context().run,
+                method,
+                query,
+                results=results,
+                skip=skip,
+                **params,
+            )
+            try:
+                while next_page is not None:
+                    page = get_page(next_page.result())
+                    skip += results
+                    next_page = None
+                    if has_next_page(page, results, skip):
+                        next_page = executor.submit(
+                            contextvars.copy_context().run,
+                            method,
+                            query,
+                            results=results,
+                            skip=skip,
+                            **params,
+                        )
+                    yield from page[0]
+            finally:
+                if next_page is not None:
+                    next_page.cancel()
+
+    @traced("prepared")
+    def _call_prepared(self, request_parameters, query):
+        return self._get_prepared(request_parameters, query)
+
+    def _get_prepared(self, request_parameters, query):
+        """Sends a prepared request as the service method does, including its caches"""
+        result = self._get(request_parameters, query, method="prepared")
+        return self._process(result)
+
+    def prepare(self, **fixed_params) -> "PreparedRequest":
+        """
+        Returns a callable sending requests with fixed parameters, which are
+        collected and encoded once. The callable takes the value of the
+        argument that varies, e.g. text for search or geocode for geocode
+
+            >>> search = client.prepare(ll=[37.61, 55.75], spn=[0.5, 0.5], results=5)
+            >>> search('кафе')
+        """
+        fixed_parameters = self._collect_request_parameters(**fixed_params)  # type: ignore
+        return PreparedRequest(self, fixed_parameters)
 
     def close(self):
         self._client.close()
@@ -49,6 +281,24 @@ class BaseClient:
         self.close()
 
 
+class PreparedRequest:
+    """
+    Request with fixed parameters, see BaseClient.prepare
+    """
+
+    def __init__(self, client: BaseClient, fixed_parameters: Dict):
+        self.client = client
+        self.argument = client.PREPARED_ARGUMENT
+        self.parameters = fixed_parameters
+        self.query = str(QueryParams({**client._client.params, **fixed_parameters}))
+
+    def __call__(self, value) -> Any:
+        value = encode_value(value)
+        request_parameters = {**self.parameters, self.argument: value}
+        query = "{}&{}".format(self.query, QueryParams({self.argument: value}))
+        return self.client._call_prepared(request_parameters, query)
+
+
 class SearchClient(BaseClient, ParameterCollector):
     """
     Yandex Place API client
@@ -58,19 +308,38 @@ class SearchClient(BaseClient, ParameterCollector):
     """
 
     BASE_URL = "https://search-maps.yandex.ru/v1"
+    SERVICE = "search"
 
     def __init__(
         self,
         api_key: str,
         language: Optional[str] = DefaultSettings.language,
         timeout: Optional[int] = DefaultSettings.timeout,
+        **options,
     ):
-        super().__init__(self.BASE_URL, api_key, language, timeout)
+        super().__init__(self.BASE_URL, api_key, language, timeout, **options)
 
+    @traced("search")
     def search(self, text: str, **params) -> Dict:
         """Search for a geographical object or organization"""
         request_parameters = super()._collect_request_parameters(text=text, **params)
-        return self._get(request_parameters).json()
+        return self._decode(self._get(request_parameters))
+
+    def search_many(
+        self,
+        texts: Iterable[str],
+        concurrency: int = DefaultSettings.concurrency,
+        deduplicator: Optional[Deduplicator] = None,
+        **params,
+    ) -> List:
+        """Search for several texts in a thread pool"""
+        return self._gather(self.search, texts, concurrency, deduplicator, **params)
+
+    def iter_search(
+        self, text: str, results: int = DefaultSettings.page_size, **params
+    ) -> Iterator[Dict]:
+        """Yields features of all result pages"""
+        return self._iter_pages(self.search, search_page, text, results, **params)
 
 
 class GeocodeClient(BaseClient, ParameterCollector):
@@ -82,31 +351,83 @@ class GeocodeClient(BaseClient, ParameterCollector):
     """
 
     BASE_URL = "https://geocode-maps.yandex.ru/1.x"
+    SERVICE = "geocode"
+    PREPARED_ARGUMENT = "geocode"
 
     def __init__(
         self,
         api_key: str,
         language: Optional[str] = DefaultSettings.language,
         timeout: Optional[int] = DefaultSettings.timeout,
+        reverse_cache: Optional[ReverseCache] = None,
+        **options,
     ):
-        super().__init__(self.BASE_URL, api_key, language, timeout)
+        self._reverse_cache = reverse_cache
+        super().__init__(self.BASE_URL, api_key, language, timeout, **options)
 
+    @traced("geocode")
     def geocode(self, geocode: str, **params) -> Dict:
         """Search for geographical coordinates of objects"""
         request_parameters = self._collect_request_parameters(geocode=geocode, **params)
         return self._get(request_parameters)
 
+    @traced("reverse")
     def reverse(self, geocode: List, **params) -> Dict:
         """Search for objects by geographical coordinates"""
         request_parameters = self._collect_reverse_parameters(geocode, **params)
-        return self._get(request_parameters)
+        return self._get_reverse(request_parameters)
 
-    def _get(self, request_parameters):
-        result = super()._get(request_parameters)
+    def geocode_many(
+        self,
+        geocodes: Iterable[str],
+        concurrency: int = DefaultSettings.concurrency,
+        deduplicator: Optional[Deduplicator] = None,
+        **params,
+    ) -> List:
+        """Geocode several addresses in a thread pool"""
+        return self._gather(self.geocode, geocodes, concurrency, deduplicator, **params)
+
+    def reverse_many(
+        self,
+        geocodes: Iterable[List],
+        concurrency: int = DefaultSettings.concurrency,
+        deduplicator: Optional[Deduplicator] = None,
+        **params,
+    ) -> List:
+        """Reverse geocode several coordinates in a thread pool"""
+        return self._gather(self.reverse, geocodes, concurrency, deduplicator, **params)
+
+    def iter_geocode(
+        self, geocode: str, results: int = DefaultSettings.page_size, **params
+    ) -> Iterator[Dict]:
+        """Yields featureMember items of all result pages"""
+        return self._iter_pages(self.geocode, geocode_page, geocode, results, **params)
+
+    def _process(self, result):
+        return result
+
+    def _get_reverse(self, request_parameters, query=None, method="reverse"):
+        if self._reverse_cache is None:
+            return self._get(request_parameters, query, method)
+
+        cache_parameters = {**self._client.params, **request_parameters}
+        result = self._reverse_cache.get(cache_parameters)
+        if result is None:
+            result = self._get(request_parameters, query, method)
+            self._reverse_cache.set(cache_parameters, result)
+        return result
+
+    def _get_prepared(self, request_parameters, query):
+        if COORDINATE_PAIR.fullmatch(str(request_parameters["geocode"])):
+            return self._get_reverse(request_parameters, query, "prepared")
+        return super()._get_prepared(request_parameters, query)
+
+    def _get(self, request_parameters, query=None, method=None):
+        result = super()._get(request_parameters, query, method)
         if request_parameters["format"] == "json" and not request_parameters.get(
             "callback"
         ):
-            return result.json()
+            return self._decode(result)
         return result.text
 
     def _collect_reverse_parameters(self, geocode, **params):
@@ -128,19 +449,48 @@ class SuggestClient(BaseClient, ParameterCollector):
     """
 
     BASE_URL = "https://suggest-maps.yandex.ru/v1/suggest"
+    SERVICE = "suggest"
 
     def __init__(
         self,
         api_key: str,
         language: Optional[str] = DefaultSettings.suggest_language,
         timeout: Optional[int] = DefaultSettings.timeout,
+        prefix_cache: Optional[PrefixCache] = None,
+        **options,
     ):
-        super().__init__(self.BASE_URL, api_key, language, timeout)
+        self._prefix_cache = prefix_cache
+        super().__init__(self.BASE_URL, api_key, language, timeout, **options)
 
+    @traced("suggest")
     def suggest(self, text: str, **params) -> Dict:
         """Get suggestions based on search results"""
         request_parameters = super()._collect_request_parameters(text=text, **params)
-        return self._get(request_parameters).json()
+        return self._get_suggestions(request_parameters)
+
+    def suggest_many(
+        self,
+        texts: Iterable[str],
+        concurrency: int = DefaultSettings.concurrency,
+        deduplicator: Optional[Deduplicator] = None,
+        **params,
+    ) -> List:
+        """Get suggestions for several texts in a thread pool"""
+        return self._gather(self.suggest, texts, concurrency, deduplicator, **params)
+
+    def _get_suggestions(self, request_parameters, query=None, method=None):
+        if self._prefix_cache is None:
+            return self._decode(self._get(request_parameters, query, method))
+
+        cache_parameters = {**self._client.params, **request_parameters}
+        result = self._prefix_cache.get(cache_parameters)
+        if result is None:
+            result = self._decode(self._get(request_parameters, query, method))
+            self._prefix_cache.set(cache_parameters, result)
+        return result
+
+    def _get_prepared(self, request_parameters, query):
+        return self._get_suggestions(request_parameters, query, "prepared")
 
 
 class StaticClient(BaseClient, ParameterCollector):
@@ -152,6 +502,8 @@ class StaticClient(BaseClient, ParameterCollector):
     """
 
     BASE_URL = "https://static-maps.yandex.ru/v1"
+    SERVICE = "static"
+    PREPARED_ARGUMENT = "ll"
 
     def __init__(
         self,
@@ -159,17 +511,57 @@ class StaticClient(BaseClient, ParameterCollector):
         language: Optional[str] = DefaultSettings.language,
         timeout: Optional[int] = DefaultSettings.timeout,
         url: str = DefaultSettings.static_url,
+        **options,
     ):
         if url == "1.x":
             self.BASE_URL = self.BASE_URL.replace(DefaultSettings.static_url, "1.x//")
-        super().__init__(self.BASE_URL, api_key, language, timeout)
+        super().__init__(self.BASE_URL, api_key, language, timeout, **options)
 
-    def load_image(self, path, **params):
-        content = self.get_image(**params)
-        with open(path, "wb") as file:
-            file.write(content)
-        return content
+    def _process(self, result):
+        return result.content
 
+    @traced("load_image")
+    def load_image(self, path: str, **params) -> str:
+        """
+        Streams an image according to the given parameters to the file at path.
+        The image is written to a temporary file, which replaces path when complete.
+        Requests are rate limited and retried as in get_image, an image cached by
+        get_image is written without a request, streamed images are not cached
+        """
+        request_parameters = self._collect_request_parameters(**params)
+        observe = (
+            self._metrics.observe(self.SERVICE, "load_image")
+            if self._metrics is not None
+            else nullcontext()
+        )
+        with observe as observation:
+            cached: Optional[Response] = None
+            if self._cache is not None:
+                cached = self._cache.get(self._request_key(request_parameters))
+            response = self._send(request_parameters, stream=True) if cached is None else cached
+            try:
+                if observation is not None:
+                    observation.response = response
+                    observation.cache_hit = cached is not None
+                if response.status_code != 200:
+                    response.read()
+                Exceptions(response).get_exception_or_response()
+
+                file = temporary_file(path)
+                try:
+                    with file:
+                        for chunk in response.iter_bytes(DefaultSettings.chunk_size):
+                            file.write(chunk)
+                    os.replace(file.name, path)
+                except BaseException:
+                    os.unlink(file.name)
+                    raise
+            finally:
+                if cached is None:
+                    response.close()
+        return path
+
+    @traced("get_image")
     def get_image(self, **params) -> bytes:
         """
         Returns an image according to the given parameters
@@ -180,4 +572,4 @@ class StaticClient(BaseClient, ParameterCollector):
             >>>     file.write(response)
         """
         request_parameters = self._collect_request_parameters(**params)
-        return self._get(request_parameters).content
+        return self._get(request_parameters, method="get_image").content
@@ -0,0 +1,365 @@
+"""
+Fake Yandex Maps API for load tests of ymaps pipelines
+"""
+
+import asyncio
+import functools
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from httpx import ASGITransport, MockTransport, Request, Response
+
+
+Latency = Callable[[random.Random], float]
+
+SERVICES = {
+    "search-maps.yandex.ru": "search",
+    "geocode-maps.yandex.ru": "geocode",
+    "suggest-maps.yandex.ru": "suggest",
+    "static-maps.yandex.ru": "static",
+}
+REQUIRED_PARAMETERS = {
+    "search": ("text",),
+    "geocode": ("geocode",),
+    "suggest": ("text",),
+    "static": (),
+}
+REASONS = {
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+def constant(seconds: float) -> Latency:
+    return lambda generator: seconds
+
+
+def uniform(low: float, high: float) -> Latency:
+    return lambda generator: generator.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float) -> Latency:
+    """Long-tailed latency, e.g. lognormal(0.05, 0.5) has p99 about 0.16 seconds"""
+    return lambda generator: generator.lognormvariate(math.log(median), sigma)
+
+
+class Burst:
+    """
+    Answers `length` consecutive requests with 429 out of every `every` requests
+    """
+
+    def __init__(self, every: int, length: int, retry_after: Optional[int] = None):
+        if not 0 < length <= every:
+            raise ValueError("length must be positive and not greater than every")
+        self.every = every
+        self.length = length
+        self.retry_after = retry_after
+
+    def is_limited(self, number: int) -> bool:
+        """Checks whether the request with the given number (from 0) is in a burst"""
+        return number % self.every >= self.every - self.length
+
+
+class FakeServer:
+    """
+    ASGI application mimicking the search, geocode, suggest and static APIs
+
+    The service is chosen by the Host header, a path prefix (/search/v1,
+    /geocode/1.x, ...) is used when the server is run under another host.
+    Every service returns `found` objects in pages of the `results` parameter,
+    static returns an image of `image_size` bytes.
+
+    Async clients call the server in process with async_transport(),
+    sync clients with transport(). The application can also be run
+    with any ASGI server
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        latency: Optional[Latency] = None,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        burst: Optional[Burst] = None,
+        found: int = 100,
+        image_size: int = 30 * 1024,
+        seed: Optional[int] = None,
+    ):
+        self.api_key = api_key
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.burst = burst
+        self.found = found
+        self.image_size = image_size
+        self.requests = 0
+        self.statuses: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def respond(
+        self, host: str, path: str, params: Dict[str, str]
+    ) -> Tuple[float, Response]:
+        """Returns the delay and the response to a request"""
+        with self._lock:
+            number = self.requests
+            self.requests += 1
+            delay = self.latency(self._random) if self.latency else 0.0
+            failed = self._random.random() < self.error_rate
+        response = self._get_response(number, failed, host, path, params)
+        with self._lock:
+            self.statuses[response.status_code] += 1
+        return delay, response
+
+    def _get_response(self, number, failed, host, path, params) -> Response:
+        service = self._get_service(host, path)
+        if service is None:
+            return self._error(404, "Unknown service")
+        if self.burst and self.burst.is_limited(number):
+            headers = {}
+            if self.burst.retry_after is not None:
+                headers["retry-after"] = str(self.burst.retry_after)
+            return self._error(429, "Too many requests", headers)
+        if failed:
+            return self._error(self.error_status, "Injected error")
+
+        api_key = params.get("apikey")
+        if (self.api_key and api_key != self.api_key) or (
+            not api_key and service != "static"
+        ):
+            return self._error(403, "Invalid api key")
+        for parameter in REQUIRED_PARAMETERS[service]:
+            if not params.get(parameter):
+                return self._error(400, "Parameter {} is required".format(parameter))
+        try:
+            results = int(params.get("results", 10))
+            skip = int(params.get("skip", 0))
+        except ValueError:
+            return self._error(400, "Parameters results and skip must be integers")
+
+        if service == "static":
+            return Response(
+                200, headers={"content-type": "image/png"}, content=png(self.image_size)
+            )
+        count = max(0, min(results, self.found - skip))
+        content = payload(service, skip, count, self.found)
+        return Response(
+            200, headers={"content-type": "application/json"}, content=content
+        )
+
+    @staticmethod
+    def _get_service(host, path) -> Optional[str]:
+        service = SERVICES.get(host.split(":")[0])
+        if service is None:
+            prefix = path.strip("/").split("/")[0]
+            service = prefix if prefix in REQUIRED_PARAMETERS else None
+        return service
+
+    @staticmethod
+    def _error(status_code, message, headers=None) -> Response:
+        body = {
+            "statusCode": status_code,
+            "error": REASONS.get(status_code, ""),
+            "message": message,
+        }
+        return Response(status_code, headers=headers, json=body)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                await send({"type": message["type"] + ".complete"})
+                if message["type"] == "lifespan.shutdown":
+                    return
+        headers = dict(scope["headers"])
+        params = dict(parse_qsl(scope["query_string"].decode()))
+        delay, response = self.respond(
+            headers.get(b"host", b"").decode(), scope["path"], params
+        )
+        if delay:
+            await asyncio.sleep(delay)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": response.headers.raw,
+            }
+        )
+        await send({"type": "http.response.body", "body": response.content})
+
+    def handle(self, request: Request) -> Response:
+        delay, response = self.respond(
+            request.url.host, request.url.path, dict(request.url.params)
+        )
+        if delay:
+            time.sleep(delay)
+        return response
+
+    def transport(self) -> MockTransport:
+        """Transport for sync clients, latency blocks the calling thread"""
+        return MockTransport(self.handle)
+
+    def async_transport(self) -> ASGITransport:
+        """Transport for async clients"""
+        return ASGITransport(app=self)
+
+
+def png(size: int) -> bytes:
+    """PNG signature followed by filler up to size bytes"""
+    signature = b"\x89PNG\r\n\x1a\n"
+    return signature + bytes(max(0, size - len(signature)))
+
+
+def encode(body: Dict) -> bytes:
+    return json.dumps(body, ensure_ascii=False).encode()
+
+
+@functools.lru_cache(maxsize=1024)
+def payload(service: str, skip: int, count: int, found: int) -> bytes:
+    """Encoded response body with the objects skip...skip + count"""
+    if service == "search":
+        return encode(search_response(count, skip, found))
+    if service == "geocode":
+        return encode(geocode_response(count, skip, found))
+    return encode(suggest_response(count, skip))
+
+
+def search_response(count: int, skip: int = 0, found: int = 10000) -> Dict:
+    """Search API response with the structure and size of a real one"""
+    return {
+        "type": "FeatureCollection",
+        "properties": {
+            "ResponseMetaData": {
+                "SearchRequest": {"request": "кафе", "results": count, "skip": skip},
+                "SearchResponse": {"found": found, "display": "multiple"},
+            }
+        },
+        "features": [search_feature(index) for index in range(skip, skip + count)],
+    }
+
+
+def geocode_response(count: int, skip: int = 0, found: int = 1000) -> Dict:
+    """Geocoder response with the structure and size of a real one"""
+    return {
+        "response": {
+            "GeoObjectCollection": {
+                "metaDataProperty": {
+                    "GeocoderResponseMetaData": {
+                        "request": "Москва, Новый Арбат",
+                        "results": str(count),
+                        "skip": str(skip),
+                        "found": str(found),
+                    }
+                },
+                "featureMember": [geo_object(index) for index in range(skip, skip + count)],
+            }
+        }
+    }
+
+
+def suggest_response(count: int, skip: int = 0) -> Dict:
+    """Suggest API response with the structure and size of a real one"""
+    return {
+        "suggest_reqid": "1234567890",
+        "results": [suggestion(index) for index in range(skip, skip + count)],
+    }
+
+
+def address(index: int) -> str:
+    return "Москва, улица Новый Арбат, {}".format(index + 1)
+
+
+def position(index: int) -> Tuple[float, float]:
+    return 37.5 + index * 0.0001, 55.7 + index * 0.0001
+
+
+def search_feature(index: int) -> Dict:
+    lon, lat = position(index)
+    name = "Кафе «Пример» №{}".format(index + 1)
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lon, lat]},
+        "properties": {
+            "name": name,
+            "description": address(index),
+            "boundedBy": [[lon - 0.004, lat - 0.002], [lon + 0.004, lat + 0.002]],
+            "CompanyMetaData": {
+                "id": str(1000000000 + index),
+                "name": name,
+                "address": address(index),
+                "url": "https://example.ru/{}".format(index + 1),
+                "Phones": [{"type": "phone", "formatted": "+7 (495) 000-00-00"}],
+                "Categories": [
+                    {"class": "cafe", "name": "Кафе"},
+                    {"class": "restaurants", "name": "Ресторан"},
+                ],
+                "Hours": {
+                    "text": "ежедневно, 10:00–23:00",
+                    "Availabilities": [
+                        {
+                            "Everyday": True,
+                            "Intervals": [{"from": "10:00:00", "to": "23:00:00"}],
+                        }
+                    ],
+                },
+            },
+        },
+    }
+
+
+def geo_object(index: int) -> Dict:
+    lon, lat = position(index)
+    text = "Россия, " + address(index)
+    return {
+        "GeoObject": {
+            "metaDataProperty": {
+                "GeocoderMetaData": {
+                    "precision": "exact",
+                    "text": text,
+                    "kind": "house",
+                    "Address": {
+                        "country_code": "RU",
+                        "formatted": text,
+                        "postal_code": "119019",
+                        "Components": [
+                            {"kind": "country", "name": "Россия"},
+                            {"kind": "province", "name": "Центральный федеральный округ"},
+                            {"kind": "province", "name": "Москва"},
+                            {"kind": "locality", "name": "Москва"},
+                            {"kind": "street", "name": "улица Новый Арбат"},
+                            {"kind": "house", "name": str(index + 1)},
+                        ],
+                    },
+                }
+            },
+            "name": "улица Новый Арбат, {}".format(index + 1),
+            "description": "Москва, Россия",
+            "boundedBy": {
+                "Envelope": {
+                    "lowerCorner": "{} {}".format(lon - 0.004, lat - 0.002),
+                    "upperCorner": "{} {}".format(lon + 0.004, lat + 0.002),
+                }
+            },
+            "Point": {"pos": "{} {}".format(lon, lat)},
+        }
+    }
+
+
+def suggestion(index: int) -> Dict:
+    title = address(index)
+    return {
+        "title": {"text": title, "hl": [{"begin": 0, "end": 6}]},
+        "subtitle": {"text": "Россия"},
+        "tags": ["house"],
+        "distance": {"value": 634000.0 + index, "text": "634 км"},
+    }
@@ -0,0 +1,174 @@
+"""
+Static map tile prefetching for ymaps
+
+Yandex maps use the elliptical Mercator projection (EPSG:3395) with
+256 pixel tiles, x grows to the east and y grows to the south
+"""
+
+import asyncio
+import math
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ymaps.settings import DefaultSettings
+from ymaps.asynchr import StaticAsyncClient
+
+TILE_SIZE = 256
+ECCENTRICITY = 0.0818191908426
+MAX_LATITUDE = 85.08405903
+
+
+def lonlat_to_pixel(lon: float, lat: float, zoom: int) -> Tuple[float, float]:
+    """Converts geographical coordinates to global pixel coordinates at zoom"""
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    phi = math.radians(lat)
+    sin_phi = ECCENTRICITY * math.sin(phi)
+    y = math.log(
+        math.tan(math.pi / 4 + phi / 2)
+        * ((1 - sin_phi) / (1 + sin_phi)) ** (ECCENTRICITY / 2)
+    )
+    world_size = TILE_SIZE * 2**zoom
+    return (
+        (lon + 180) / 360 * world_size,
+        (0.5 - y / (2 * math.pi)) * world_size,
+    )
+
+
+def pixel_to_lonlat(x: float, y: float, zoom: int) -> Tuple[float, float]:
+    """Converts global pixel coordinates at zoom to geographical coordinates"""
+    world_size = TILE_SIZE * 2**zoom
+    t = math.exp((y / world_size - 0.5) * 2 * math.pi)
+    phi = math.pi / 2 - 2 * math.atan(t)
+    for _ in range(10):
+        sin_phi = ECCENTRICITY * math.sin(phi)
+        phi = math.pi / 2 - 2 * math.atan(
+            t * ((1 - sin_phi) / (1 + sin_phi)) ** (ECCENTRICITY / 2)
+        )
+    return x / world_size * 360 - 180, math.degrees(phi)
+
+
+def tile_center(x: int, y: int, zoom: int) -> Tuple[float, float]:
+    return pixel_to_lonlat((x + 0.5) * TILE_SIZE, (y + 0.5) * TILE_SIZE, zoom)
+
+
+def tiles_in_bbox(bbox: List[float], zoom: int) -> Iterator[Tuple[int, int]]:
+    """Yields tiles covering bbox given as [lon, lat, lon, lat] of two corners"""
+    left, top = lonlat_to_pixel(min(bbox[0], bbox[2]), max(bbox[1], bbox[3]), zoom)
+    right, bottom = lonlat_to_pixel(max(bbox[0], bbox[2]), min(bbox[1], bbox[3]), zoom)
+    last = 2**zoom - 1
+    for x in range(int(left // TILE_SIZE), min(last, int(right // TILE_SIZE)) + 1):
+        for y in range(int(top // TILE_SIZE), min(last, int(bottom // TILE_SIZE)) + 1):
+            yield x, y
+
+
+class TileStore:
+    """
+    SQLite store of map images keyed by zoom, column, row and layer,
+    similar to MBTiles but with rows counted from the north
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection as connection:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS tiles ("
+                "zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, "
+                "layer TEXT, tile_data BLOB, "
+                "PRIMARY KEY (zoom_level, tile_column, tile_row, layer))"
+            )
+
+    def get(self, zoom: int, x: int, y: int, layer: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT tile_data FROM tiles WHERE "
+                "zoom_level = ? AND tile_column = ? AND tile_row = ? AND layer = ?",
+                (zoom, x, y, layer),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, zoom: int, x: int, y: int, layer: str, data: bytes) -> None:
+        with self._lock, self._connection as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?)",
+                (zoom, x, y, layer, data),
+            )
+
+    def contains(self, zoom: int, x: int, y: int, layer: str) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM tiles WHERE "
+                "zoom_level = ? AND tile_column = ? AND tile_row = ? AND layer = ?",
+                (zoom, x, y, layer),
+            ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class TilePrefetcher:
+    """
+    Fetches tiles covering a bbox through StaticAsyncClient into a TileStore
+
+    At most `concurrency` images are requested and kept in memory at once
+    """
+
+    def __init__(
+        self,
+        client: StaticAsyncClient,
+        store: TileStore,
+        concurrency: int = DefaultSettings.concurrency,
+    ):
+        self.client = client
+        self.store = store
+        self.concurrency = concurrency
+
+    async def prefetch(
+        self,
+        bbox: List[float],
+        zooms: Iterable[int],
+        layer: str = "map",
+        skip_existing: bool = True,
+        **params,
+    ) -> Dict[str, int]:
+        """
+        Fetches tiles for every zoom, params are passed to get_image,
+        e.g. l=['sat'] for the 1.x api. Returns counts of fetched,
+        skipped and failed tiles
+        """
+        loop = asyncio.get_running_loop()
+        stats = {"fetched": 0, "skipped": 0, "failed": 0}
+        tiles = ((zoom, x, y) for zoom in zooms for x, y in tiles_in_bbox(bbox, zoom))
+
+        async def worker():
+            for zoom, x, y in tiles:
+                if skip_existing and await loop.run_in_executor(
+                    None, self.store.contains, zoom, x, y, layer
+                ):
+                    stats["skipped"] += 1
+                    continue
+                try:
+                    image = await self.client.get_image(
+                        ll=tile_center(x, y, zoom),
+                        z=zoom,
+                        size=[TILE_SIZE, TILE_SIZE],
+                        **params,
+                    )
+                except Exception:
+                    stats["failed"] += 1
+                    continue
+                await loop.run_in_executor(
+                    None, self.store.put, zoom, x, y, layer, image
+                )
+                stats["fetched"] += 1
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return stats
@@ -0,0 +1,197 @@
+"""
+Per-phase request tracing for ymaps clients
+"""
+
+import asyncio
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+PHASES = {
+    "collect": "collect",
+    "connect_tcp": "connect",
+    "connect_unix_socket": "connect",
+    "start_tls": "tls",
+    "send_connection_init": "send",
+    "send_request_headers": "send",
+    "send_request_body": "send",
+    "receive_response_headers": "ttfb",
+    "receive_response_body": "body",
+    "decode": "decode",
+}
+
+
+class Trace:
+    """
+    Monotonic timestamps of a client method call split into phases:
+        collect - parameter collection before the request
+        pool_wait - from sending to the first connection event, the wait
+            for a free connection in the pool
+        connect, tls - opening of a new connection
+        send - sending of the request
+        ttfb - the wait for response headers
+        body - download of the response body
+        decode - JSON decoding
+    Connection events are recorded by httpx transports with the trace extension,
+    retried requests add up
+    """
+
+    def __init__(self, service: str, method: str):
+        self.service = service
+        self.method = method
+        self.events: List[Tuple[str, float]] = []
+        self.error: Optional[str] = None
+        self.start = time.monotonic()
+        self.end: Optional[float] = None
+
+    def mark(self, name: str) -> None:
+        self.events.append((name, time.monotonic()))
+
+    def event(self, name: str, info: Dict) -> None:
+        """Callback of the httpx trace extension"""
+        self.events.append((name, time.monotonic()))
+
+    async def event_async(self, name: str, info: Dict) -> None:
+        self.events.append((name, time.monotonic()))
+
+    @property
+    def attempts(self) -> int:
+        return sum(1 for name, _ in self.events if name == "ymaps.send.started")
+
+    def phases(self) -> Dict[str, float]:
+        """Returns the duration of every phase in seconds"""
+        durations: Dict[str, float] = {}
+        started: Dict[str, float] = {}
+        sending = None
+        for name, timestamp in self.events:
+            prefix, _, step = name.partition(".")
+            if sending is not None and prefix != "ymaps":
+                durations["pool_wait"] = durations.get("pool_wait", 0.0) + (
+                    timestamp - sending
+                )
+                sending = None
+            if name == "ymaps.send.started":
+                sending = timestamp
+                continue
+
+            step, _, state = step.rpartition(".")
+            phase = PHASES.get(step)
+            if phase is None:
+                continue
+            if state == "started":
+                started[step] = timestamp
+            elif step in started:
+                durations[phase] = durations.get(phase, 0.0) + (
+                    timestamp - started.pop(step)
+                )
+        if self.end is not None:
+            durations["total"] = self.end - self.start
+        return durations
+
+    def as_dict(self) -> Dict:
+        return {
+            "service": self.service,
+            "method": self.method,
+            "start": self.start,
+            "end": self.end,
+            "error": self.error,
+            "attempts": self.attempts,
+            "phases": self.phases(),
+            "events": [(name, timestamp - self.start) for name, timestamp in self.events],
+        }
+
+
+_trace: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar(
+    "ymaps_trace", default=None
+)
+_collector: "contextvars.ContextVar[Optional[List[Trace]]]" = contextvars.ContextVar(
+    "ymaps_trace_collector", default=None
+)
+
+
+def current_trace() -> Optional[Trace]:
+    """Returns the trace of the client method being called"""
+    return _trace.get()
+
+
+@contextmanager
+def collect_traces() -> Iterator[List[Trace]]:
+    """
+    Collects traces of client calls made in the block, in threads of batch
+    methods and in tasks started in the block
+
+        >>> with collect_traces() as traces:
+        >>>     client.geocode('Москва')
+        >>> traces[0].phases()
+    """
+    traces: List[Trace] = []
+    token = _collector.set(traces)
+    try:
+        yield traces
+    finally:
+        _collector.reset(token)
+
+
+def _start(client, method) -> Optional[Trace]:
+    if client._tracer is None and _collector.get() is None:
+        return None
+    return Trace(client.SERVICE, method)
+
+
+def _finish(client, trace, token, error) -> None:
+    _trace.reset(token)
+    trace.end = time.monotonic()
+    if error is not None:
+        trace.error = type(error).__name__
+    traces = _collector.get()
+    if traces is not None:
+        traces.append(trace)
+    if client._tracer is not None:
+        client._tracer(trace)
+
+
+def traced(method: str) -> Callable:
+    """Decorates a client method, which is traced if the client has a tracer
+    or traces are collected"""
+
+    def decorator(function):
+        if asyncio.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(self, *args, **kwargs):
+                trace = _start(self, method)
+                if trace is None:
+                    return await function(self, *args, **kwargs)
+                token, error = _trace.set(trace), None
+                trace.mark("ymaps.collect.started")
+                try:
+                    return await function(self, *args, **kwargs)
+                except BaseException as exception:
+                    error = exception
+                    raise
+                finally:
+                    _finish(self, trace, token, error)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            trace = _start(self, method)
+            if trace is None:
+                return function(self, *args, **kwargs)
+            token, error = _trace.set(trace), None
+            trace.mark("ymaps.collect.started")
+            try:
+                return function(self, *args, **kwargs)
+            except BaseException as exception:
+                error = exception
+                raise
+            finally:
+                _finish(self, trace, token, error)
+
+        return wrapper
+
+    return decorator